@@ -6,7 +6,7 @@ repositories to be checked out. Works on bare repositories.
 import json
 import re
 import pathlib
-import urllib
+import urllib.parse
 import os
 
 from utils import constants as c, utils as u, archive as a
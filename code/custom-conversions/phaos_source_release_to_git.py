@@ -3,6 +3,7 @@ Downloads source releases from Sourceforge and puts them into a git repository
 """
 
 import json
+import urllib.request
 import datetime
 from utils.utils import *
 
@@ -0,0 +1,448 @@
+"""
+Language server (Language Server Protocol over stdin/stdout) for editing entry files. Keeps the entries, developers and
+inspirations in memory (loaded once from the snapshot, see osg.read_snapshot, or file by file if anything is invalid,
+skipping the invalid files) and offers
+
+- diagnostics of the open entry on every change, with the same checks as when reading the entries
+  (osg.check_and_process_entry) and the links to developers and inspirations (osg_graph)
+- completion of property names and of the known values (keywords, platforms, languages, licenses, dependencies,
+  developers, inspirations, ...)
+- go to definition and hover for developers and inspirations (their place in developers.md/inspirations.md, their
+  entries)
+
+Configure the editor to start it for the Markdown files in the entries folder:
+
+    python code/entries_language_server.py [--verbose]
+
+With --verbose the time taken by every request is written to the standard error. Errors (invalid files, failed
+notifications) are written to the standard error and to the log of the editor (window/logMessage).
+"""
+
+import json
+import pathlib
+import re
+import sys
+import time
+import urllib.parse
+
+from utils import osg, osg_graph, osg_names, utils, constants as c
+
+# vocabularies for the values of these fields are collected from the entries
+collected_fields = ('Keyword', 'Code dependency', 'Assets license', 'Build system')
+
+# LSP constants
+full_sync = 1
+error_severity, warning_severity = 1, 2
+property_kind, value_kind, reference_kind = 10, 12, 18
+
+# most completion items returned at once
+completion_limit = 200
+
+# a property line, possibly incomplete
+regex_property = re.compile(r'^- ?([^:]*)(?::(.*))?$')
+
+# the location of a parse error in a message of the parser
+regex_parse_error_location = re.compile(r'at line (\d+), column (\d+)')
+
+
+def path_from_uri(uri):
+    return pathlib.Path(urllib.parse.unquote(urllib.parse.urlparse(uri).path))
+
+
+def listing_lines(file):
+    """
+    Line numbers (0-based) of the developers or inspirations in a listing file.
+    """
+    text = utils.read_text(file)
+    lines = {}
+    line = 0
+    position = 0
+    for match in osg_names.regex_listing_name.finditer(text):
+        line += text.count('\n', position, match.start())
+        position = match.start()
+        lines[match.group(1)] = line
+    return lines
+
+
+def value_at(text, character):
+    """
+    The value (without comment) of a comma separated list of values at a character position.
+    """
+    start = text.rfind(',', 0, character) + 1
+    end = text.find(',', character)
+    value = text[start:end if end >= 0 else len(text)]
+    return value.split(' (')[0].strip().strip('"')
+
+
+def utf16_length(text):
+    """
+    Length in UTF-16 code units (positions in LSP are given in those).
+    """
+    return len(text.encode('utf-16-le')) // 2
+
+
+def character_index(line, character):
+    """
+    Index into a line from a position given in UTF-16 code units.
+    """
+    units = 0
+    for index, x in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(x) > 0xFFFF else 1
+    return len(line)
+
+
+class EntriesLanguageServer:
+    """
+    Answers the requests and notifications of the editor. The open documents are kept by uri.
+    """
+
+    def __init__(self, output, verbose=False):
+        self.output = output
+        self.verbose = verbose
+        self.documents = {}
+        self.running = True
+        self.initialized = False
+        self.reports = []  # errors before the editor is initialized
+        self.load()
+
+    def load(self):
+        """
+        Loads entries, developers and inspirations from the snapshot or, if that fails because anything is invalid,
+        file by file, skipping the invalid files.
+        """
+        start_time = time.perf_counter()
+        try:
+            entries, developers, inspirations = osg.read_snapshot()
+        except Exception:
+            self.report('Snapshot not available (invalid files), reading the files one by one')
+            entries = self.read_entries()
+            developers = self.read_listing('developer', osg.read_developers)
+            inspirations = self.read_listing('inspiration', osg.read_inspirations)
+        self.entries = {entry['File'].name: entry for entry in entries}
+        self.listings = {'developer': dict(developers), 'inspiration': dict(inspirations)}
+        self.references = osg_graph.CrossReferences(self.entries.values(), **{f'{kind}s': listing for kind, listing in self.listings.items()})
+        self.listing_lines = {kind: listing_lines(file) for kind, file in osg_names.listing_files.items()}
+        self.update_vocabularies()
+        self.log(f'{len(self.entries)} entries loaded ({time.perf_counter() - start_time:.1f}s)')
+
+    def read_entries(self):
+        """
+        All valid entries (the invalid ones are reported).
+        """
+        entries = []
+        for file, name, content in osg.entry_iterator():
+            entry, e = osg.parse_entry(file, content)
+            if e:
+                self.report(f'{name} skipped: {e}')
+                continue
+            entry.mark_unmodified()
+            entries.append(entry)
+        return entries
+
+    def read_listing(self, kind, read):
+        """
+        Developers or inspirations, empty (and reported) if the listing is invalid.
+        """
+        try:
+            return read()
+        except Exception as e:
+            self.report(f'{osg_names.listing_files[kind].name} skipped: {e}')
+            return {}
+
+    def update_vocabularies(self):
+        collected = {field: set() for field in collected_fields}
+        for entry in self.entries.values():
+            for field, values in collected.items():
+                record = entry['Building'] if field in c.valid_building_properties else entry
+                values.update(str(x) for x in record.get(field, []))
+        vocabularies = {field: sorted(values, key=str.casefold) for field, values in collected.items()}
+        vocabularies['Keyword'] = sorted(set(vocabularies['Keyword']) | set(c.recommended_keywords), key=str.casefold)
+        vocabularies['Code language'] = list(c.known_languages)
+        vocabularies['Code license'] = list(c.known_licenses)
+        vocabularies['Platform'] = list(c.valid_platforms)
+        vocabularies['State'] = ['beta', 'mature', 'inactive since ']
+        for kind, (_, field) in osg_graph.listing_fields.items():
+            vocabularies[field] = sorted(self.listings[kind], key=str.casefold)
+        self.vocabularies = vocabularies
+
+    # communication
+
+    def log(self, message):
+        print(message, file=sys.stderr, flush=True)
+
+    def report(self, message):
+        """
+        Logs an error and sends it to the log of the editor (as soon as it is initialized).
+        """
+        self.log(message)
+        if self.initialized:
+            self.notify('window/logMessage', {'type': 1, 'message': message})
+        else:
+            self.reports.append(message)
+
+    def send(self, message):
+        message['jsonrpc'] = '2.0'
+        body = json.dumps(message, ensure_ascii=False).encode('utf-8')
+        self.output.write(f'Content-Length: {len(body)}\r\n\r\n'.encode('ascii') + body)
+        self.output.flush()
+
+    def notify(self, method, params):
+        self.send({'method': method, 'params': params})
+
+    def handle(self, message):
+        """
+        Dispatches a request or notification to the method of the same name (with "/" and "$" replaced).
+        """
+        method = message.get('method')
+        start_time = time.perf_counter()
+        handler = getattr(self, 'on_' + method.replace('/', '_').replace('$', '_'), None) if method else None
+        if 'id' in message:
+            if handler is None:
+                self.send({'id': message['id'], 'error': {'code': -32601, 'message': f'{method} not supported'}})
+            else:
+                try:
+                    self.send({'id': message['id'], 'result': handler(message.get('params', {}))})
+                except Exception as e:
+                    self.send({'id': message['id'], 'error': {'code': -32603, 'message': str(e)}})
+        elif handler is not None:
+            try:
+                handler(message.get('params', {}))
+            except Exception as e:
+                self.report(f'{method} failed: {e}')
+        if self.verbose:
+            self.log(f'{method} {(time.perf_counter() - start_time) * 1000:.1f}ms')
+
+    # lifecycle
+
+    def on_initialize(self, params):
+        return {'capabilities': {'textDocumentSync': {'openClose': True, 'change': full_sync, 'save': True},
+                                 'completionProvider': {'triggerCharacters': [':', ',', ' ']},
+                                 'definitionProvider': True, 'hoverProvider': True},
+                'serverInfo': {'name': 'osgl-entries'}}
+
+    def on_initialized(self, params):
+        self.initialized = True
+        for message in self.reports:
+            self.notify('window/logMessage', {'type': 1, 'message': message})
+        self.reports = []
+
+    def on_shutdown(self, params):
+        return None
+
+    def on_exit(self, params):
+        self.running = False
+
+    # documents
+
+    def on_textDocument_didOpen(self, params):
+        document = params['textDocument']
+        self.documents[document['uri']] = document['text']
+        self.publish_diagnostics(document['uri'])
+
+    def on_textDocument_didChange(self, params):
+        uri = params['textDocument']['uri']
+        self.documents[uri] = params['contentChanges'][-1]['text']
+        self.publish_diagnostics(uri)
+
+    def on_textDocument_didClose(self, params):
+        uri = params['textDocument']['uri']
+        self.documents.pop(uri, None)
+        self.notify('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': []})
+
+    def on_textDocument_didSave(self, params):
+        """
+        Takes a saved entry (or listing) into the database in memory.
+        """
+        file = path_from_uri(params['textDocument']['uri'])
+        if file.parent == c.root_path and file.name in (x.name for x in osg_names.listing_files.values()):
+            kind = next(kind for kind, x in osg_names.listing_files.items() if x.name == file.name)
+            listing = osg.read_developers() if kind == 'developer' else osg.read_inspirations()
+            self.listings[kind] = listing
+            self.references.set_listing(kind, listing)
+            self.listing_lines[kind] = listing_lines(file)
+            self.update_vocabularies()
+        elif file.parent == c.entries_path and file.suffix == '.md':
+            entry, e = osg.parse_entry(file, utils.read_text(file))
+            if e:
+                return
+            entry.mark_unmodified()
+            old_entry = self.entries.get(file.name)
+            if old_entry:
+                self.references.remove_entry(old_entry)
+            self.entries[file.name] = entry
+            self.references.add_entry(entry)
+            self.update_vocabularies()
+
+    # diagnostics
+
+    def diagnostics(self, file, text):
+        """
+        Problems of an entry: the same as when reading it and problems with the links to developers and inspirations.
+        """
+        lines = text.split('\n')
+        entry, e = osg.parse_entry(file, text)
+        if e:
+            message = str(e).strip()
+            match = regex_parse_error_location.search(message)
+            if match:
+                line = int(match.group(1)) - 1
+                return [self.diagnostic(lines, line, message.split('\n')[0], error_severity, int(match.group(2)) - 1)]
+            return [self.diagnostic(lines, self.locate(lines, problem), problem, error_severity) for problem in message.split('\n') if problem]
+
+        problems = []
+        title = entry['Title']
+        others = [x['File'].name for x in self.references.entries.get(title, []) if x['File'].name != file.name]
+        if others:
+            problems.append(self.diagnostic(lines, 0, f'Title also used by {", ".join(others)}', error_severity))
+        for kind, (_, field) in osg_graph.listing_fields.items():
+            listing = self.listings[kind]
+            for name in entry.get(field, []):
+                if name not in listing:
+                    message = f'{kind.capitalize()} "{name}" not in {osg_names.listing_files[kind].name} (yet)'
+                    problems.append(self.diagnostic(lines, self.locate(lines, f'"{name}"', field), message, warning_severity))
+        return problems
+
+    def locate(self, lines, message, field=None):
+        """
+        Line of a problem: where the first quoted text of the message appears (in the line of a field if given).
+        """
+        match = re.search(r'"([^"]+)"', message)
+        if match:
+            text = match.group(1)
+            for number, line in enumerate(lines):
+                if (field is None or line.startswith(f'- {field}:')) and (text in line):
+                    return number
+        return 0
+
+    def diagnostic(self, lines, line, message, severity, character=0):
+        line = min(max(line, 0), len(lines) - 1)
+        length = utf16_length(lines[line])
+        return {'range': {'start': {'line': line, 'character': min(character, length)},
+                          'end': {'line': line, 'character': length}},
+                'severity': severity, 'source': 'osgl', 'message': message}
+
+    def publish_diagnostics(self, uri):
+        file = path_from_uri(uri)
+        if file.parent != c.entries_path or file.suffix != '.md':
+            return
+        text = self.documents[uri]
+        if not text.endswith('\n'):
+            text += '\n'
+        self.notify('textDocument/publishDiagnostics', {'uri': uri, 'diagnostics': self.diagnostics(file, text)})
+
+    # completion, definition, hover
+
+    def property_at(self, params):
+        """
+        Property (key, text of the values, index in the values text) at a position or None.
+        """
+        text = self.documents.get(params['textDocument']['uri'])
+        if text is None:
+            return None
+        lines = text.split('\n')
+        number = params['position']['line']
+        if number >= len(lines):
+            return None
+        line = lines[number]
+        character = character_index(line, params['position']['character'])
+        match = regex_property.match(line)
+        if not match:
+            return None
+        building = '## Building' in lines[:number]
+        key = match.group(1).strip()
+        if match.group(2) is None or character <= match.start(2):
+            return building, key, None, None
+        return building, key, match.group(2), character - match.start(2)
+
+    def on_textDocument_completion(self, params):
+        property = self.property_at(params)
+        if property is None:
+            return None
+        building, key, values, character = property
+        if values is None:
+            names = c.valid_building_properties if building else c.valid_properties
+            return [{'label': name, 'kind': property_kind, 'insertText': f'{name}: '} for name in names if name.startswith(key)]
+        prefix = values[:character]
+        prefix = prefix[prefix.rfind(',') + 1:].lstrip().casefold()
+        kind = reference_kind if key in ('Developer', 'Inspiration') else value_kind
+        items = [x for x in self.vocabularies.get(key, []) if x.casefold().startswith(prefix)]
+        return {'isIncomplete': len(items) > completion_limit,
+                'items': [{'label': x, 'kind': kind} for x in items[:completion_limit]]}
+
+    def reference_at(self, params):
+        """
+        Kind (developer or inspiration) and name at a position or None.
+        """
+        property = self.property_at(params)
+        if property is None or property[2] is None:
+            return None
+        _, key, values, character = property
+        kind = next((kind for kind, (_, field) in osg_graph.listing_fields.items() if field == key), None)
+        if kind is None:
+            return None
+        return kind, value_at(values, character)
+
+    def on_textDocument_definition(self, params):
+        reference = self.reference_at(params)
+        if reference is None:
+            return None
+        kind, name = reference
+        locations = []
+        line = self.listing_lines[kind].get(name)
+        if line is not None:
+            locations.append({'uri': osg_names.listing_files[kind].as_uri(),
+                              'range': {'start': {'line': line, 'character': 0}, 'end': {'line': line, 'character': 0}}})
+        for entry in self.references.entries.get(name, []):  # inspirations that are included themselves
+            locations.append({'uri': entry['File'].as_uri(), 'range': {'start': {'line': 0, 'character': 0}, 'end': {'line': 0, 'character': 0}}})
+        return locations
+
+    def on_textDocument_hover(self, params):
+        reference = self.reference_at(params)
+        if reference is None:
+            return None
+        kind, name = reference
+        listing_field, _ = osg_graph.listing_fields[kind]
+        item = self.listings[kind].get(name)
+        if item is None:
+            text = f'{kind.capitalize()} "{name}" is not in {osg_names.listing_files[kind].name}'
+        else:
+            text = f'**{name}**\n\n{listing_field}: {", ".join(item[listing_field])}'
+            referenced = self.references.referenced_by_entries[kind].get(name, [])
+            if set(referenced) != set(item[listing_field]):
+                text += f'\n\nReferenced by: {", ".join(referenced)}'
+        return {'contents': {'kind': 'markdown', 'value': text}}
+
+
+def read_message(stream):
+    """
+    Reads one message (headers and a JSON body) or returns None at the end of the stream.
+    """
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        key, _, value = line.decode('ascii').partition(':')
+        if key.strip().casefold() == 'content-length':
+            length = int(value)
+    return json.loads(stream.read(length).decode('utf-8')) if length is not None else {}
+
+
+if __name__ == "__main__":
+
+    # messages go to the standard output, anything printed (for example by the readers) to the standard error
+    output = sys.stdout.buffer
+    sys.stdout = sys.stderr
+
+    server = EntriesLanguageServer(output, verbose='--verbose' in sys.argv)
+    while server.running:
+        message = read_message(sys.stdin.buffer)
+        if message is None:
+            break
+        if message:
+            server.handle(message)
@@ -0,0 +1,63 @@
+"""
+Differential test of the fast entry reader (osg_parse.fast_parse_entry) against the Lark grammar based parser
+(grammar_entries.lark with osg_parse.EntryTransformer). Runs both over every file in entries/ and checks that the
+results are identical (including types and comments of the values). The fast reader may give up on some files (these
+are then parsed by Lark), but must never produce a different result or accept something Lark rejects.
+
+Run it after every change of the grammar, the transformer or the fast reader.
+"""
+
+import sys
+import time
+
+from utils import osg, osg_parse, constants as c
+
+
+def describe(value):
+    """
+    Makes the types and comments of all values visible for the comparison.
+    """
+    if isinstance(value, osg_parse.Value):
+        return 'Value', str(value), value.comment
+    if isinstance(value, str):
+        return 'str', value
+    if isinstance(value, (list, tuple)):
+        return type(value).__name__, [describe(x) for x in value]
+    return type(value).__name__, repr(value)
+
+
+if __name__ == "__main__":
+
+    parse = osg_parse.get_parser(c.entries_grammar_file, osg_parse.EntryTransformer)
+
+    number_files, number_fallbacks, differences = 0, 0, []
+    lark_time, fast_time = 0, 0
+    for file, _, content in osg.entry_iterator():
+        number_files += 1
+        if not content.endswith('\n'):
+            content += '\n'
+
+        # parse with the grammar
+        start_time = time.perf_counter()
+        try:
+            expected = parse(content)
+        except Exception:
+            expected = None
+        lark_time += time.perf_counter() - start_time
+
+        # parse with the fast reader
+        start_time = time.perf_counter()
+        actual = osg_parse.fast_parse_entry(content)
+        fast_time += time.perf_counter() - start_time
+
+        if actual is None:
+            number_fallbacks += 1
+        elif expected is None:
+            differences.append(f'{file.name}: accepted by the fast reader, but not by the grammar')
+        elif describe(actual) != describe(expected):
+            differences.append(f'{file.name}: different results\n  fast: {actual}\n  lark: {expected}')
+
+    print('\n'.join(differences))
+    print(f'{number_files} entries compared, {number_fallbacks} not handled by the fast reader, {len(differences)} differences')
+    print(f'lark took {lark_time:.3f}s, fast reader took {fast_time:.3f}s')
+    sys.exit(1 if differences else 0)
@@ -0,0 +1,71 @@
+"""
+Measures the memory footprint of the parsed entries, once stored as plain dictionaries with values having a per
+instance __dict__ (as it used to be) and once as compact records (osg_parse.Entry, osg_parse.Building and the slotted
+osg_parse.Value). Uses the full database and a synthetic corpus of 100k entries made from copies of the real ones.
+"""
+
+import gc
+import tracemalloc
+
+from utils import osg, osg_parse
+
+number_synthetic = 100_000
+
+
+class DictValue(str):
+    """
+    The value type as it used to be (without slots, i.e. with a __dict__ per instance).
+    """
+
+    def __new__(cls, value, comment=None):
+        obj = str.__new__(cls, value)
+        obj.comment = comment
+        return obj
+
+
+def copy_value(value, as_dict):
+    """
+    Deep copy of a value (new string objects), so that copies of an entry do not share memory.
+    """
+    if isinstance(value, osg_parse.Value):
+        Value = DictValue if as_dict else osg_parse.Value
+        return Value(''.join(value), value.comment)
+    if isinstance(value, str):
+        return ''.join(value)
+    if isinstance(value, list):
+        return [copy_value(x, as_dict) for x in value]
+    if isinstance(value, (dict, osg_parse.Record)):
+        return copy_record(value, as_dict)
+    return value
+
+
+def copy_record(record, as_dict):
+    items = [(key, copy_value(value, as_dict)) for key, value in record.items()]
+    if as_dict:
+        return dict(items)
+    return type(record)(items)
+
+
+def measure(entries, as_dict, number):
+    """
+    Size in bytes of number copies of the entries (cycled).
+    """
+    gc.collect()
+    tracemalloc.start()
+    copies = [copy_record(entries[i % len(entries)], as_dict) for i in range(number)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del copies
+    return size
+
+
+if __name__ == "__main__":
+
+    entries = osg.read_entries()
+
+    for label, number in (('database', len(entries)), ('synthetic', number_synthetic)):
+        dict_size = measure(entries, True, number)
+        record_size = measure(entries, False, number)
+        print(f'{label} ({number} entries): dictionaries {dict_size / 2**20:.1f} MiB ({dict_size / number:.0f} B/entry), '
+              f'records {record_size / 2**20:.1f} MiB ({record_size / number:.0f} B/entry), '
+              f'saved {1 - record_size / dict_size:.0%}')
@@ -1,48 +1,30 @@
 """
 Checks a list of game names (comma separated in text file) if they are already included in the database.
 Is fuzzy, i.e. accepts a certain similarity of names.
-"""
-
-import json
-import re
-from difflib import SequenceMatcher
-from utils.utils import *
 
+Uses the local SQLite database (see utils/osg_database.py), which is updated first.
+"""
 
-def similarity(a, b):
-    return SequenceMatcher(None, a, b).ratio()
+from utils import osg_database, utils, constants as c
 
 
 if __name__ == "__main__":
     similarity_threshold = 0.7
 
-    root_path = os.path.realpath(__file__.parent / os.path.pardir)
-
-    # read docs/data.json
-    data_file = root_path / 'docs', 'data.json'
-    text = read_text(data_file)
-    data = json.loads(text)
-
-    # extract game names
-    data = data['data']
-    data = (x[0] for x in data)
-    existing_names = list(re.sub(r' \([^)]*\)', '', x) for x in data)
+    # update the database
+    connection = osg_database.connect()
+    osg_database.update(connection)
 
     # read names to test
-    test_file = root_path / 'is_already_included.txt'
-    text = read_text(test_file)
-    test_names = text.split(', ')
+    test_file = c.root_path / 'is_already_included.txt'
+    text = utils.read_text(test_file)
+    test_names = [name.strip() for name in text.split(',')]
 
     # loop over all test names
     for test_name in test_names:
-        matches = []
-        # loop over all existing names
-        for existing_name in existing_names:
-            s = similarity(test_name.lower(), existing_name.lower())
-            if s > similarity_threshold:
-                matches.append(f'{existing_name} ({s:.2f})')
+        matches = osg_database.similar_titles(connection, test_name, similarity_threshold)
         # were matches found
         if matches:
-            print(f"{test_name} maybe included in {', '.join(matches)}")
+            print(f"{test_name} maybe included in {', '.join(f'{title} ({s:.2f})' for title, s in matches)}")
         else:
             print(f'{test_name} not included')
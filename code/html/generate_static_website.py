@@ -7,6 +7,14 @@ Uses
 - Simple-DataTables (https://github.com/fiduswriter/Simple-DataTables)
 
 Sitemap is not needed, only for large projects with lots of JavaScript und many pages that aren't discoverable.
+
+Builds are incremental (see Build): a page is only rendered again if anything it depends on changed since the last
+build. The pages are minified while they are written (see minify).
+
+    python html/generate_static_website.py [--fast[=number]]
+
+With --fast only a sample of the changed pages (and all pages whose template changed) is validated, the next build
+without it validates the rest.
 """
 
 # TODO tab: new filter tab (playable in a browser) with tiles (https://bulma.io/documentation/layout/tiles/) sorted by genre (just as normal list so far, no tiles yet)
@@ -21,7 +29,7 @@ Sitemap is not needed, only for large projects with lots of JavaScript und many
 # TODO keywords: explain most common ones (as alt-text maybe?)
 
 # TODO general: most people only come to the main page, put more information there (direct links to genres, ...)
-# TODO general: minimize tag usage: jinja template optimization for line breaks and indention and minimal amount of spaces (and size of files) and minimal amount of repetition of tags
+# TODO general: minimize tag usage: minimal amount of repetition of tags (whitespace and optional end tags are already removed, see minify)
 # TODO general: too many spans, especially for text (maybe just plain text), also text with URLs inside is difficult (but why)
 # TODO general: replace or remove @notices like @add in entries (these notices should go to () comments anyway
 # TODO general: check singular, plural (game, entries, items) although support is already quite good for that (Code Languages, ...)
@@ -68,20 +76,34 @@ Sitemap is not needed, only for large projects with lots of JavaScript und many
 # TODO inspirations: if included in the database, link instead to game (cross-reference)
 # TODO inspirations: add media links and genres, maybe also years and original developer
 
+import concurrent.futures
+import contextlib
+import copy
+import filecmp
 import os
 import pathlib
 import shutil
 import math
 import datetime
+import hashlib
+import io
 import time
 import json
+import pickle
+import random
+import re
 import string
+import sys
+try:
+    import resource  # peak memory, not available on Windows
+except ImportError:
+    resource = None
 from functools import partial
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, meta
 import html5lib
 
-from utils import osg, constants as c, utils, osg_statistics as stat, osg_parse
+from utils import osg, osg_cache, osg_changes, constants as c, utils, osg_statistics as stat, osg_parse
 
 # the categories for the alphabetical indices, letters A-Z, used for identification and as link names internally
 alphabet = string.ascii_uppercase
@@ -96,6 +118,9 @@ alphabet_replacements = {'Á': 'A', 'Å': 'A', 'Ä': 'A', 'É': 'E', 'ⴹ': 'E',
 
 TOP_INSPIRATION_THRESHOLD = 4  # at least that many inspired games
 TOP_DEVELOPER_THRESHOLD = 4    # at least that many developed games
+VALIDATION_SAMPLE = 10         # number of changed pages validated in fast mode (--fast, or --fast=number)
+MINIFY_BLOCK = 65536           # number of characters of a page minified at once (see Minifier)
+FRAGMENT_BATCH = 1000          # number of entries, developers or inspirations converted and rendered at once
 
 # the subfolder structure
 games_path = ['games']
@@ -182,8 +207,31 @@ non_game_category_names = {
 # we check the output html structure every time
 html5parser = html5lib.HTMLParser(strict=True)
 
-# file hashes for detecting changes
-previous_files = {}
+# minification of the pages (see minify)
+regex_raw_text = re.compile(r'(<(?:pre|textarea|script|style)\b.*?</(?:pre|textarea|script|style)>)', re.DOTALL)
+regex_raw_text_start = re.compile(r'<(pre|textarea|script|style)\b')
+regex_newline = re.compile(r'[ \t\r\f]*\n[ \t\n\r\f]*')  # only ASCII whitespace, not for example &nbsp;
+regex_spaces = re.compile(r'[ \t\r\f]{2,}|[\t\r\f]')
+regex_class = re.compile(r'( class=") ?([^"]*?) ?"')
+regex_quoted_value = re.compile(r'="([^\s"\'=<>`]+)"(?!/)(?=[^<>]*>)')  # in tags only
+
+# elements whose end tag may be omitted (https://html.spec.whatwg.org/multipage/syntax.html#optional-tags): element ->
+# elements that may follow it directly and elements whose end may follow it (None: all)
+optional_end_tags = {
+    'li': ({'li'}, None),
+    'p': ({'address', 'article', 'aside', 'blockquote', 'details', 'div', 'dl', 'fieldset', 'figcaption', 'figure',
+           'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hgroup', 'hr', 'main', 'menu', 'nav', 'ol',
+           'p', 'pre', 'section', 'table', 'ul'},
+          {'address', 'article', 'aside', 'blockquote', 'body', 'button', 'caption', 'dd', 'details', 'dialog', 'div',
+           'fieldset', 'figcaption', 'figure', 'footer', 'form', 'header', 'li', 'main', 'nav', 'section', 'td', 'th'}),
+    'td': ({'td', 'th'}, None),
+    'th': ({'td', 'th'}, None),
+    'tr': ({'tr'}, None),
+    'option': ({'option', 'optgroup'}, None),
+    'body': (set(), {'html'}),
+}
+regex_end_tag = re.compile(f'</({"|".join(optional_end_tags)})>(?=[ \\n]?<(/?)([a-zA-Z][a-zA-Z0-9]*))')
+
 
 # pluralization (mostly with s, but there are a few exceptions)
 plurals = {k: k+'s' for k in ('Assets license', 'Contact', 'Code language', 'Code license', 'Developer', 'Download', 'Inspiration', 'Game', 'Keyword', 'Home', 'Homepage', 'Organization', 'Platform', 'Tag')}
@@ -210,10 +258,106 @@ def file_hash(text):
     :param text:
     :return:
     """
-    text = text.split('\n')
-    text = [t for t in text if not any(t.startswith(prefix) for prefix in ('  This website is built ', '    <dc:date>'))]
-    text = ''.join(text)
-    return hash(text)
+    h = ContentHash()
+    h.update(text)
+    return h.hexdigest()
+
+
+class ContentHash:
+    """
+    Incremental file_hash of a text given in pieces (for example a page while it is written).
+    """
+
+    def __init__(self):
+        self.hash = hashlib.blake2b(digest_size=16)
+        self.line = []  # pieces of the current (incomplete) line
+
+    def update(self, text):
+        *lines, rest = text.split('\n')
+        if lines:
+            self.line.append(lines[0])
+            lines[0] = ''.join(self.line)
+            self.line = []
+            for line in lines:
+                self.add(line)
+        self.line.append(rest)
+
+    def add(self, line):
+        if not line.lstrip().startswith(('This website is built ', '<dc:date>')):
+            self.hash.update(line.encode('utf-8'))
+
+    def hexdigest(self):
+        self.add(''.join(self.line))
+        self.line = []
+        return self.hash.hexdigest()
+
+
+def minify(text):
+    """
+    Minifies HTML without changing how it is displayed: every run of whitespace (also in tags) becomes a single newline
+    or space, optional end tags (see optional_end_tags) are removed, class lists are trimmed and attribute values lose
+    their quotes where not needed. The content of pre, textarea, script and style elements is kept as it is.
+
+    Newlines are kept, so that changes of the pages (under version control) still show as changed lines.
+    """
+    parts = regex_raw_text.split(text)
+    for i in range(0, len(parts), 2):
+        part = regex_spaces.sub(' ', regex_newline.sub('\n', parts[i]))
+        part = regex_quoted_value.sub(r'=\1', regex_class.sub(r'\1\2"', part))
+        parts[i] = regex_newline.sub('\n', regex_end_tag.sub(omit_end_tag, part))
+    return ''.join(parts)
+
+
+def omit_end_tag(match):
+    name, parent_end, following = match.groups()
+    elements, parents = optional_end_tags[name]
+    if parent_end:
+        omit = parents is None or following in parents
+    else:
+        omit = following in elements
+    return '' if omit else match.group()
+
+
+class Minifier:
+    """
+    Minifies a page given in pieces (see minify), in blocks of at least MINIFY_BLOCK characters. The last tag (and
+    everything after it) is held back until the following pieces show what comes after it, as well as an unfinished pre,
+    textarea, script or style element. Counts the size (in bytes) before and after.
+    """
+
+    def __init__(self):
+        self.pieces = []
+        self.length = 0
+        self.sizes = [0, 0]
+
+    def update(self, text):
+        self.pieces.append(text)
+        self.length += len(text)
+        self.sizes[0] += len(text.encode('utf-8'))
+        if self.length < MINIFY_BLOCK:
+            return ''
+        text = ''.join(self.pieces)
+        position = text.rfind('<')
+        starts = list(regex_raw_text_start.finditer(text))
+        if position <= 0 or (starts and f'</{starts[-1].group(1)}>' not in text[starts[-1].start():]):
+            self.pieces = [text]
+            return ''
+        self.pieces = [text[position:]]
+        self.length = len(self.pieces[0])
+        text = minify(text)
+        return self.output(text[:text.rfind('<')])
+
+    def finish(self):
+        text = minify(''.join(self.pieces)).rstrip()
+        self.pieces = []
+        self.length = 0
+        if text.endswith('</html>'):
+            text = text[:-len('</html>')].rstrip()
+        return self.output(text + '\n')
+
+    def output(self, text):
+        self.sizes[1] += len(text.encode('utf-8'))
+        return text
 
 
 def raise_helper(msg):
@@ -224,54 +368,533 @@ def raise_helper(msg):
     raise Exception(msg)
 
 
-def write(text, path):
+def compare(digest, file, previous):
     """
-    Writes a generated HTML page to a file, but checks with a HTML parser before.
-    :param text:
-    :param file:
+    Compares a generated page with the existing file. If the page did not change significantly (see file_hash) since it
+    was written before, the file does not need to be written again (and keeps its creation date). Without a record of
+    the previous version, the existing file is read and compared instead.
+
+    :param digest: Content hash of the page (see file_hash)
+    :param previous: Manifest record (content hash, file stamp, validated) of the previous version of the file or None
+    :return: True if the file is unchanged
     """
-    # output file
-    if isinstance(path, str):
-        path = [path]
-    file = c.web_path
-    for part in path:
-        file /= part
-
-    # check file hash and use previous version
-    if file in previous_files and previous_files[file]['hash'] == file_hash(text):
-        # no significant change, use previous version instead
-        text = previous_files[file]['text']
-    else:
-        # validate text
-        try:
-            html5parser.parse(text)
-        except Exception as e:
-            utils.write_text(c.web_path / 'invalid.html', text)  # for further checking with https://validator.w3.org/
-            print(f'problem with file {file}, see invalid.html')
-            raise RuntimeError(e)
-
-    # create output directory if necessary
+    if not file.is_file():
+        return False
+    if previous is not None:
+        return previous[0] == digest and previous[1] == file_stamp(file)
+    return file_hash(utils.read_text(file)) == digest
+
+
+def is_validated(record):
+    """
+    True if the page of a manifest record was validated.
+    """
+    return record is not None and record[2:] == [True]
+
+
+def validate(file):
+    """
+    Checks a generated page (in a file) with a HTML parser.
+
+    :return: None if valid, otherwise the problem
+    """
+    try:
+        html5parser.parse(utils.read_text(file))
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def temporary_file(file):
+    """
+    File a page is streamed into before it is validated and moved to its place (see render_page).
+    """
+    return file.with_name(f'.{file.name}.tmp')
+
+
+def copy_if_changed(source, destination):
+    """
+    Copies a file (with its modification time) unless the destination has the same size and modification time or the
+    same content (then only the modification time is taken over).
+
+    :return: True if the file was copied
+    """
+    stat = source.stat()
+    if destination.is_file():
+        destination_stat = destination.stat()
+        if destination_stat.st_size == stat.st_size:
+            if destination_stat.st_mtime_ns == stat.st_mtime_ns:
+                return False
+            if filecmp.cmp(source, destination, shallow=False):
+                shutil.copystat(source, destination)
+                return False
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(source, destination)
+    return True
+
+
+class Build:
+    """
+    Incremental build of the pages. Records for every page what it depends on: its template (including the templates
+    it extends or imports) and everything in the render context. A page is only rendered again if any of that changed
+    since the last build or if the page file was changed (or deleted) in the meantime. The record is kept in the cache
+    folder and is discarded completely if the code of the generator (or the parsing of the entries) changes.
+
+    The entries, developers and inspirations are on the listing pages as HTML fragments (their boxes), which are cached
+    the same way by everything they depend on, so that only new or changed items are converted and rendered (see
+    render_fragments).
+
+    Independent of that, the build manifest (also in the cache folder, kept if the code changes) stores the content hash
+    (see file_hash), the stamp and the validation state of every written page, so that rendered pages that did not
+    change are recognized without reading the previous files (see compare) and are not validated again.
+
+    Pages are rendered, validated and written in stages (see render). Only changed pages that were not validated
+    before (by content hash) are validated. In fast mode (with a validation sample) only those whose template changed
+    and a random sample of the other ones are validated, the rest is validated by the next build in normal mode.
+
+    The output directory is kept in sync with the build: every file that the build produces is registered (see output)
+    and all other files are removed at the end (see prune).
+    """
+
+    def __init__(self, environment, validation_sample=None):
+        """
+        :param environment: Jinja environment
+        :param validation_sample: Number of pages to validate in fast mode or None (normal mode, validate all)
+        """
+        self.environment = environment
+        self.template_hashes = {}
+        self.template_sources = {}
+        self.version = osg_cache.version() + file_hash_of(pathlib.Path(__file__))
+        state = {}
+        if c.website_build_file.is_file():
+            try:
+                state = json.loads(utils.read_text(c.website_build_file))
+            except ValueError:
+                pass
+        self.previous_templates = state.get('templates', {})  # also if the code changed
+        if state.get('version') != self.version:
+            state = {}
+        self.previous_pages = state.get('pages', {})
+        self.previous_charts = state.get('charts', {})
+        fragments = {}
+        if c.website_fragments_file.is_file():
+            try:
+                fragments = json.loads(utils.read_text(c.website_fragments_file))
+            except ValueError:
+                pass
+        self.previous_fragments = fragments.get('fragments', {}) if fragments.get('version') == self.version else {}
+        self.previous_manifest = {}
+        if c.website_manifest_file.is_file():
+            try:
+                self.previous_manifest = json.loads(utils.read_text(c.website_manifest_file))
+            except ValueError:
+                pass
+        self.pages = {}
+        self.charts = {}
+        self.manifest = {}
+        self.validation_sample = validation_sample
+        self.validated_hashes = {record[0] for record in self.previous_manifest.values() if is_validated(record)}
+        self.validated = 0
+        self.not_validated = 0
+        self.times = {}
+        self.fragments = {}
+        self.fragments_rendered = 0
+        self.minified = {}  # section -> number of rendered pages, size before and after minification
+        self.outputs = set()
+        self.sync = {'written': [0, 0], 'unchanged': [0, 0], 'removed': [0, 0]}  # number of files and bytes
+        self.jobs = []
+        self.rendered = 0
+        self.unchanged = 0
+        self.skipped = 0
+
+        # load (compile) all templates up front, in warm builds from the bytecode cache (see create_environment)
+        start_time = time.perf_counter()
+        for name in environment.list_templates(extensions=['jinja']):
+            environment.get_template(name)
+        self.times['templates'] = time.perf_counter() - start_time
+
+    def digest(self, value):
+        """
+        Hash of a value (pickled).
+        """
+        output = io.BytesIO()
+        pickler = pickle.Pickler(output, protocol=pickle.HIGHEST_PROTOCOL)
+        pickler.fast = True  # no memo, so that equal values give equal hashes, whether they are shared objects or not
+        pickler.dump(value)
+        return hashlib.blake2b(output.getbuffer(), digest_size=16).hexdigest()
+
+    def template_hash(self, name):
+        """
+        Hash of a template and all templates it extends, includes or imports.
+        """
+        digest = self.template_hashes.get(name)
+        if digest is None:
+            source, references = self.template_source(name)
+            h = hashlib.blake2b(source.encode('utf-8'), digest_size=16)
+            for other in references:
+                h.update(self.template_hash(other).encode())
+            digest = self.template_hashes[name] = h.hexdigest()
+        return digest
+
+    def template_source(self, name):
+        """
+        Source of a template and the (sorted) names of the templates it extends, includes or imports (parsed only once).
+        """
+        source = self.template_sources.get(name)
+        if source is None:
+            text, _, _ = self.environment.loader.get_source(self.environment, name)
+            source = self.template_sources[name] = text, sorted(meta.find_referenced_templates(self.environment.parse(text)))
+        return source
+
+    def page(self, template, path, **context):
+        """
+        Queues a page for rendering (see render) unless it is up to date. The page is rendered with the base dictionary
+        as it is now (a copy is queued), but the context must not be changed anymore.
+        """
+        file = c.web_path.joinpath(*path)
+        name = '/'.join(path)
+        base = {k: v for k, v in self.environment.globals['base'].items() if k != 'creation-date'}
+        digest = self.digest([self.template_hash(template.name), base, context])
+        previous = self.previous_pages.get(name)
+        record = self.previous_manifest.get(name)
+        up_to_date = record and file.is_file() and record[1] == file_stamp(file) and (is_validated(record) or self.validation_sample is not None)
+        if previous and previous['hash'] == digest and up_to_date:
+            self.pages[name] = previous
+            self.manifest[name] = record
+            self.output(file, False)
+            self.skipped += 1
+            return
+        self.jobs.append((template.name, path, copy.deepcopy(self.environment.globals['base']), context, record))
+        self.pages[name] = {'hash': digest, 'templates': sorted(self.template_names(template.name))}
+
+    @contextlib.contextmanager
+    def pool(self, tasks, parallel, jobs=None):
+        """
+        Runs functions over the numbers of jobs (or other arguments), either in this process or spread over a pool of
+        worker processes.
+
+        :param tasks: Number of tasks (no more worker processes are started)
+        :param parallel: If True, uses as many worker processes as there are cores
+        :param jobs: Given to the workers once when they start (see init_renderer)
+        :return: Number of processes and a function run(function, arguments) returning the list of results
+        """
+        processes = min(os.cpu_count() or 1, tasks)
+        if not parallel or processes < 2:
+            init_renderer(jobs)
+            yield 1, lambda function, arguments: list(map(function, arguments))
+            return
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes, initializer=init_renderer, initargs=(jobs,)) as executor:
+            # a few chunks per process for load balancing
+            yield processes, lambda function, arguments: list(executor.map(function, arguments, chunksize=max(1, len(arguments) // (4 * processes))))
+
+    def render_fragments(self, requests, convert, parallel=False):
+        """
+        HTML fragments of entries, developers or inspirations (their boxes on the listing pages). A fragment is cached by
+        a hash of everything it depends on: the template (including the templates it imports), the folder of the page
+        (relative links), the item before its conversion, the links to the other items it refers to and changes of the
+        item for a page. Only items with a missing fragment are converted and rendered, in batches (see FRAGMENT_BATCH),
+        and what the conversion added to them is removed again afterwards.
+
+        :param requests: List of (template name, folder, item, references, changes or None)
+        :param convert: Function converting a list of items (those with a missing fragment)
+        :param parallel: See pool
+        :return: List of fragments in the order of the requests
+        """
+        start_time = time.perf_counter()
+        keys = [self.digest([self.template_hash(template_name), folder, list(item.items()), references, changes]) for template_name, folder, item, references, changes in requests]
+        missing = {}
+        for key, request in zip(keys, requests):
+            if key in self.previous_fragments:
+                self.fragments[key] = self.previous_fragments[key]
+            else:
+                missing[key] = request
+        missing = list(missing.items())
+        with self.pool(len(missing), parallel) as (_, run):
+            for start in range(0, len(missing), FRAGMENT_BATCH):
+                batch = missing[start:start + FRAGMENT_BATCH]
+                items = list({id(request[2]): request[2] for _, request in batch}.values())
+                fields = [set(item) for item in items]
+                convert(items)
+                jobs = [(template_name, folder, item, changes) for _, (template_name, folder, item, _, changes) in batch]
+                self.fragments.update(zip((key for key, _ in batch), run(render_fragment_job, jobs)))
+                for item, item_fields in zip(items, fields):
+                    for field in set(item) - item_fields:
+                        del item[field]
+        self.fragments_rendered += len(missing)
+        self.times['fragments'] = time.perf_counter() - start_time
+        return [self.fragments[key] for key in keys]
+
+    def render(self, parallel=False):
+        """
+        Renders, validates and writes all queued pages (using a pool, see pool). The workers get all queued pages once
+        when they start and then only the numbers of the pages to render (and later the pages to validate). The pages
+        are streamed into temporary files (see render_page) and only validated pages are moved to their place.
+
+        :param parallel: See pool
+        :return: Number of processes
+        """
+        jobs, self.jobs = self.jobs, []
+        with self.pool(len(jobs), parallel, jobs) as (processes, run):
+            # render and compare with the existing files
+            start_time = time.perf_counter()
+            results = run(render_queued_page, range(len(jobs)))
+            self.times['render'] = time.perf_counter() - start_time
+
+            # validate
+            start_time = time.perf_counter()
+            selection = self.validation_selection(jobs, results)
+            problems = run(validate, [results[i][2] for i in selection])
+            self.times['validate'] = time.perf_counter() - start_time
+        for i, problem in zip(selection, problems):
+            if problem is None:
+                self.validated_hashes.add(results[i][0])
+            else:
+                file = c.web_path.joinpath(*jobs[i][1])
+                os.replace(results[i][2], c.web_path / 'invalid.html')  # for further checking with https://validator.w3.org/
+                for _, _, temporary, _ in results:
+                    if temporary is not None:
+                        temporary.unlink(missing_ok=True)
+                print(f'problem with file {file}, see invalid.html')
+                raise RuntimeError(problem)
+        self.validated += len(selection)
+
+        # write
+        start_time = time.perf_counter()
+        for (_, path, _, _, previous), (digest, unchanged, temporary, sizes) in zip(jobs, results):
+            file = c.web_path.joinpath(*path)
+            counter = self.minified.setdefault(section(path), [0, 0, 0])
+            counter[0] += 1
+            counter[1] += sizes[0]
+            counter[2] += sizes[1]
+            if not unchanged:
+                os.replace(temporary, file)
+            elif temporary is not None:
+                temporary.unlink()
+            validated = digest in self.validated_hashes
+            self.not_validated += not validated
+            self.manifest['/'.join(path)] = [digest, file_stamp(file), validated]
+            self.output(file, not unchanged)
+            self.unchanged += unchanged
+        self.times['write'] = time.perf_counter() - start_time
+        self.rendered += len(jobs)
+        return processes
+
+    def validation_selection(self, jobs, results):
+        """
+        Positions of the rendered pages to validate: those that were not validated before (by content hash) and in
+        fast mode of these only the pages whose template changed and a random sample of the other ones.
+        """
+        positions = [i for i, (digest, _, temporary, _) in enumerate(results) if temporary is not None and digest not in self.validated_hashes]
+        if self.validation_sample is None:
+            return positions
+        selection = [i for i in positions if self.template_changed(jobs[i][0])]
+        others = [i for i in positions if i not in selection]
+        selection.extend(random.sample(others, min(self.validation_sample, len(others))))
+        return sorted(selection)
+
+    def template_changed(self, name):
+        """
+        True if a template or any template it extends, includes or imports changed since the last build.
+        """
+        return any(self.template_hash(other) != self.previous_templates.get(other) for other in self.template_names(name))
+
+    def template_names(self, name):
+        names = {name}
+        for other in self.template_source(name)[1]:
+            names |= self.template_names(other)
+        return names
+
+    def chart_is_current(self, file, statistics):
+        """
+        True if a chart of the same statistics was created before (and the file was not changed since then).
+        """
+        digest = self.digest(statistics)
+        name = file.relative_to(c.web_path).as_posix()
+        previous = self.previous_charts.get(name)
+        if previous is not None and previous[0] == digest and file.is_file() and previous[1] == file_stamp(file):
+            self.charts[name] = previous
+            self.output(file, False)
+            return True
+        self.charts[name] = [digest, None]
+        return False
+
+    def chart_written(self, file, written):
+        self.charts[file.relative_to(c.web_path).as_posix()][1] = file_stamp(file)
+        self.output(file, written)
+
+    def size_report(self):
+        """
+        Number and size of the pages by section (see section), largest first, and of the pages rendered in this build
+        the size before and after minification.
+
+        :return: List of lines
+        """
+        sizes = {}
+        for name, record in self.manifest.items():
+            counter = sizes.setdefault(section(name.split('/')), [0, 0])
+            counter[0] += 1
+            counter[1] += record[1][0]
+        lines = []
+        for name, (number, size) in sorted(sizes.items(), key=lambda x: x[1][1], reverse=True):
+            line = f'{name}: {number} pages ({size / 1e6:.2f} MB)'
+            if name in self.minified:
+                rendered, before, after = self.minified[name]
+                line += f', {rendered} rendered and minified from {before / 1e6:.2f} MB to {after / 1e6:.2f} MB (-{(1 - after / before) * 100:.0f}%)'
+            lines.append(line)
+        return lines
+
+    def output(self, file, written):
+        """
+        Registers a file in the output directory as produced by this build (written or left unchanged).
+        """
+        self.outputs.add(file)
+        counter = self.sync['written' if written else 'unchanged']
+        counter[0] += 1
+        counter[1] += file.stat().st_size
+
+    def prune(self):
+        """
+        Removes all files in the output directory that were not produced by this build (and then empty directories).
+        """
+        counter = self.sync['removed']
+        for directory, _, files in os.walk(c.web_path, topdown=False):
+            directory = pathlib.Path(directory)
+            for name in files:
+                file = directory / name
+                if file not in self.outputs:
+                    counter[0] += 1
+                    counter[1] += file.stat().st_size
+                    file.unlink()
+            if directory != c.web_path and not any(directory.iterdir()):
+                directory.rmdir()
+
+    def save(self):
+        c.cache_path.mkdir(parents=True, exist_ok=True)
+        state = {'version': self.version, 'pages': self.pages, 'charts': self.charts, 'templates': self.template_hashes}
+        utils.write_text(c.website_build_file, json.dumps(state, indent=1, ensure_ascii=False))
+        utils.write_text(c.website_manifest_file, json.dumps(self.manifest, indent=1, ensure_ascii=False))
+        # the fragments (the largest part) piece by piece, not as one string
+        with open(c.website_fragments_file, mode='w', encoding='utf-8') as f:
+            f.write(f'{{"version":{json.dumps(self.version)},"fragments":{{')
+            for i, (key, fragment) in enumerate(self.fragments.items()):
+                f.write(f'{"," if i else ""}{json.dumps(key)}:{json.dumps(fragment, ensure_ascii=False)}')
+            f.write('}}')
+
+
+def create_environment(base):
+    """
+    Jinja environment for the templates with a base dictionary (as global). Compiled templates are kept in a bytecode
+    cache (by template name and checksum of the source), so templates are only compiled again if they changed.
+    """
+    c.jinja_cache_path.mkdir(parents=True, exist_ok=True)
+    bytecode_cache = FileSystemBytecodeCache(str(c.jinja_cache_path))
+    environment = Environment(loader=FileSystemLoader(c.web_template_path), autoescape=True, bytecode_cache=bytecode_cache)
+    environment.globals['base'] = base
+    environment.globals['raise'] = raise_helper
+    environment.globals['is_list'] = is_list
+    return environment
+
+
+def is_list(obj):
+    return isinstance(obj, list)
+
+
+def render_page(environment, job):
+    """
+    Renders a queued page (see Build.page) piece by piece into a temporary file (see temporary_file), so that the page
+    is never completely in memory, minifies it on the way (see Minifier) and compares it with the existing file (see
+    compare).
+
+    :return: Content hash, True if the file is unchanged, the temporary file (None if unchanged and validated before)
+        and the size before and after minification
+    """
+    template_name, path, base, context, previous = job
+    # updated in place, imported templates (macros) are cached together with the base dictionary they saw first
+    environment.globals['base'].clear()
+    environment.globals['base'].update(base)
+    file = c.web_path.joinpath(*path)
+    temporary = temporary_file(file)
     file.parent.mkdir(parents=True, exist_ok=True)
+    h = ContentHash()
+    minifier = Minifier()
+    with open(temporary, mode='w', encoding='utf-8') as f:
+        for text in environment.get_template(template_name).generate(**context):
+            text = minifier.update(text)
+            f.write(text)
+            h.update(text)
+        text = minifier.finish()
+        f.write(text)
+        h.update(text)
+    digest = h.hexdigest()
+    unchanged = compare(digest, file, previous)
+    if unchanged and is_validated(previous):
+        temporary.unlink()  # nothing left to do
+        temporary = None
+    return digest, unchanged, temporary, minifier.sizes
+
+
+def render_fragment(environment, job):
+    """
+    Renders the fragment of an entry, developer or inspiration (see Build.render_fragments).
+    """
+    template_name, folder, item, changes = job
+    if changes:
+        item = item.copy()
+        item.update(changes)
+    environment.globals['base'].clear()
+    environment.globals['base']['url_to'] = partial(url_to, folder)
+    return environment.get_template(template_name).render(item=item)
+
+
+# the Jinja environment and the jobs of a worker process (or of this process, see Build.pool)
+renderer = {}
+
+
+def init_renderer(jobs=None):
+    if 'environment' not in renderer:
+        renderer['environment'] = create_environment({})
+    renderer['jobs'] = jobs
+
+
+def render_queued_page(index):
+    return render_page(renderer['environment'], renderer['jobs'][index])
+
+
+def render_fragment_job(job):
+    return render_fragment(renderer['environment'], job)
+
+
+def section(path):
+    """
+    Section of the website a page belongs to (its folder).
+    """
+    return path[0] if len(path) > 1 else 'top level'
+
+
+def file_stamp(file):
+    stat = file.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
 
-    # write text
-    utils.write_text(file, text)
+def file_hash_of(file):
+    return hashlib.blake2b(file.read_bytes(), digest_size=16).hexdigest()
 
 
-def sort_into_categories(items, categories, fit, unknown_category_name=None):
+def sort_into_categories(items, categories, key):
     """
-    Given a list of items and a list of categories and a way to determine if an item fits into a category creates
-    lists of items fitting in each category as well as a list of items that fit in no category.
+    Given a list of items and a list of categories and a way to determine the category of an item creates lists of
+    items in each category (in a single pass over the items). Items in other categories are ignored.
 
-    :return: A mapping category (or unknown_category_name) -> sub-list of items in that category
+    For sorting entries by the values of a field (where an entry can be in several categories) use
+    osg_index.EntryIndex.categorize instead.
+
+    :return: A mapping category -> sub-list of items in that category
     """
-    categorized_sublists = {}
-    for category in categories:
-        sublist = [item for item in items if fit(item, category)]
-        categorized_sublists[category] = sublist
-    if unknown_category_name:
-        # now those that do not fit
-        sublist = [item for item in items if not any(fit(item, category) for category in categories)]
-        categorized_sublists[unknown_category_name] = sublist
+    categorized_sublists = {category: [] for category in categories}
+    for item in items:
+        sublist = categorized_sublists.get(key(item))
+        if sublist is not None:
+            sublist.append(item)
     return categorized_sublists
 
 
@@ -795,7 +1418,7 @@ def convert_entries(entries, inspirations, developers):
                     e = [make_url(x, shortcut_url(x, name)) for x in e]
                 else:
                     e = [make_text(x) for x in e]
-                namex = make_text(f'{get_plural_or_singular(field.capitalize(), len(entries))}: ')
+                namex = make_text(f'{get_plural_or_singular(field.capitalize(), len(e))}: ')
                 entry[field.lower()] = [namex, make_enumeration(e, divider)]
 
         # build system
@@ -887,7 +1510,7 @@ d    """
             entry['screenshots'] = screenshots
 
 
-def create_table_json_data(entries):
+def create_table_json_data(build, entries):
     """
     We assume that everything including internal is setup correctly.
     Columns are Title, Link (entry, first homepage), State, Essential Keywords, Language, License
@@ -915,24 +1538,29 @@ def create_table_json_data(entries):
     # write out
     text = json.dumps(db, indent=1)
     c.web_data_path.mkdir(parents=True, exist_ok=True)
-    utils.write_text(c.web_data_path / 'entries.json', text)
+    file = c.web_data_path / 'entries.json'
+    build.output(file, utils.write_text_if_changed(file, text))
 
 
-def create_statistics_section(entries, field, title, filename, chartmaker, sub_field=None):
+def create_statistics_section(build, entries, field, title, filename, chartmaker, sub_field=None):
     """
     Creates a statistics section for a given field name from entries and a given chart type (see stat.export_xxx_chart)
+    The chart is only created if the statistics changed since the last build.
     :return:
     """
     statistics = stat.get_field_statistics(entries, field, sub_field)
     statistics = stat.truncate_stats(statistics, 10)
     file = c.web_path / 'statistics' / filename
-    chartmaker([s for s in statistics if s[0] != 'N/A'], file)
-    # read back and check if identical with old version (up to date)
-    text = utils.read_text(file)
-    if file in previous_files and previous_files[file]['hash'] == file_hash(text):
-        # use old version instead
-        text = previous_files[file]['text']
-        utils.write_text(file, text)
+    if not build.chart_is_current(file, statistics):
+        previous_text = utils.read_text(file) if file.is_file() else None
+        file.parent.mkdir(parents=True, exist_ok=True)
+        chartmaker([s for s in statistics if s[0] != 'N/A'], file)
+        # read back and check if identical with old version (up to date)
+        written = previous_text is None or file_hash(previous_text) != file_hash(utils.read_text(file))
+        if not written:
+            # use old version instead
+            utils.write_text(file, previous_text)
+        build.chart_written(file, written)
     section = {
         'title': title,
         'id': osg.canonical_name(title),
@@ -942,17 +1570,34 @@ def create_statistics_section(entries, field, title, filename, chartmaker, sub_f
     return section
 
 
-def generate(entries, inspirations, developers):
+def generate(entries, inspirations, developers, parallel=False, validation_sample=None):
     """
     Regenerates the whole static website given an already imported set of entries, inspirations and developers.
     These datasets must be valid for each other, i.e. each inspiration listed in entries must also have an
-    entry in inspirations and the same holds for developers.
+    entry in inspirations and the same holds for developers. With parallel the pages are rendered and validated by as
+    many worker processes as there are cores. With a validation sample, only that many of the changed pages (plus those
+    whose template changed) are validated (fast mode, see Build).
     """
 
+    # base dictionary
+    base = {
+        'title': 'OSGL',
+        'creation-date': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M'),
+        'css': ['bulma.min.css', 'osgl.min.css'],
+        'js': ['osgl.js']
+    }
+
+    # create Jinja Environment
+    environment = create_environment(base)
+
+    # the incremental build
+    build = Build(environment, validation_sample)
+
     # split entries in games and non-games
-    games, non_games = [], []
-    for entry in entries:
-        (games, non_games)[any([keyword in entry['Keyword'] for keyword in c.non_game_keywords])].append(entry)
+    entries_index = osg.index_entries(entries)
+    is_non_game = osg.any_of('Keyword', c.non_game_keywords)
+    games = entries_index.select(('not', is_non_game))
+    non_games = entries_index.select(is_non_game)
 
     # preprocess
     preprocess(games, 'Title', games_path)
@@ -962,17 +1607,42 @@ def generate(entries, inspirations, developers):
         keyword = [keyword for keyword in c.non_game_keywords if keyword in non_game['Keyword']][0]
         non_game['href'] = non_games_path + [f"{keyword}.html#{non_game['anchor-id']}"]
     entries = games + non_games
+    entries_index = osg.index_entries(entries)  # before any conversion of the indexed fields
+    games_index = osg.index_entries(games)
+    non_games_index = osg.index_entries(non_games)
     preprocess(inspirations, 'Name', inspirations_path)
     preprocess(developers, 'Name', developers_path)
 
-    # set internal links up
-    convert_inspirations(inspirations, entries)
-    convert_developers(developers, entries)
-    convert_entries(games, inspirations, developers)
-    convert_entries(non_games, inspirations, developers)
+    # extract top Github stars games
+    Ntop = 100
+    top_games = get_topN_games(games, N=Ntop)
+
+    # the boxes of all entries, developers and inspirations (only new or changed ones are converted and rendered)
+    entries_references = {entry['Title']: entry['href'] for entry in entries}
+    inspirations_references = {inspiration['Name']: inspiration['href'] for inspiration in inspirations}
+    developers_references = {developer['Name']: developer['href'] for developer in developers}
+    requests = []
+    for folder, items in ((games_path, games), (non_games_path, non_games)):
+        requests.extend(('card_entry.jinja', folder, entry, [[inspirations_references[x] for x in entry.get('Inspiration', [])], [developers_references[x] for x in entry.get('Developer', [])]], None) for entry in items)
+    requests.extend(('card_developer.jinja', developers_path, developer, [entries_references[x] for x in developer['Games']], None) for developer in developers)
+    requests.extend(('card_inspiration.jinja', inspirations_path, inspiration, [entries_references[x] for x in inspiration['Inspired entries']], None) for inspiration in inspirations)
+    # the top games are numbered
+    references = {id(request[2]): request[3] for request in requests}
+    top_requests = [('card_entry.jinja', games_path, game, references[id(game)], {'name': f"{index + 1}. {game['Title']}"}) for index, game in enumerate(top_games)]
+
+    def convert(items):
+        # set internal links up
+        selection = {id(item) for item in items}
+        convert_inspirations([x for x in inspirations if id(x) in selection], entries)
+        convert_developers([x for x in developers if id(x) in selection], entries)
+        convert_entries([x for x in entries if id(x) in selection], inspirations, developers)
+
+    fragments = build.render_fragments(requests + top_requests, convert, parallel)
+    fragment = {id(request[2]): x for request, x in zip(requests, fragments)}
+    top_fragments = fragments[len(requests):]
 
     # create entries.json for the table
-    create_table_json_data(entries)
+    create_table_json_data(build, entries)
 
     # create statistics data
     statistics_data = {
@@ -981,72 +1651,56 @@ def generate(entries, inspirations, developers):
     }
 
     # supported platforms
-    section = create_statistics_section(entries, 'Platform', 'Supported platforms', 'supported_platforms.svg', partial(stat.export_bar_chart, aspect_ratio=0.7, tick_label_rotation=45))
+    section = create_statistics_section(build, entries, 'Platform', 'Supported platforms', 'supported_platforms.svg', partial(stat.export_bar_chart, aspect_ratio=0.7, tick_label_rotation=45))
     statistics_data['sections'].append(section)
 
     # code languages
-    section = create_statistics_section(entries, 'Code language', 'Code languages', 'code_languages.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45))
+    section = create_statistics_section(build, entries, 'Code language', 'Code languages', 'code_languages.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45))
     statistics_data['sections'].append(section)
 
     # code license
-    section = create_statistics_section(entries, 'Code license', 'Code licenses', 'code_licenses.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45))
+    section = create_statistics_section(build, entries, 'Code license', 'Code licenses', 'code_licenses.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45))
     statistics_data['sections'].append(section)
 
     # code dependencies
-    section = create_statistics_section(entries, 'Code dependency', 'Code dependencies', 'code_dependencies.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45))
+    section = create_statistics_section(build, entries, 'Code dependency', 'Code dependencies', 'code_dependencies.svg', partial(stat.export_bar_chart, aspect_ratio=1.5, tick_label_rotation=45))
     statistics_data['sections'].append(section)
 
     # build-systems
-    section = create_statistics_section(entries, 'Build system', 'Build systems', 'build_systems.svg', stat.export_pie_chart, sub_field='Building')
+    section = create_statistics_section(build, entries, 'Build system', 'Build systems', 'build_systems.svg', stat.export_pie_chart, sub_field='Building')
     statistics_data['sections'].append(section)
 
     # set external links up (statistics and entries.json doesn't work anymore beyond that point)
     add_license_links_to_entries(entries)
 
     # sort into categories
-    sorter = lambda item, category: category == item['letter']
-    games_by_alphabet = sort_into_categories(games, extended_alphabet, sorter)
-    inspirations_by_alphabet = sort_into_categories(inspirations, extended_alphabet, sorter)
-    developers_by_alphabet = sort_into_categories(developers, extended_alphabet, sorter)
+    letter = lambda item: item['letter']
+    games_by_alphabet = sort_into_categories(games, extended_alphabet, letter)
+    inspirations_by_alphabet = sort_into_categories(inspirations, extended_alphabet, letter)
+    developers_by_alphabet = sort_into_categories(developers, extended_alphabet, letter)
 
     genres = [keyword.capitalize() for keyword in c.recommended_keywords if keyword not in c.non_game_keywords]
     genres.sort()
-    games_by_genre = sort_into_categories(games, genres, lambda item, category: category.lower() in item['Keyword'])
-    games_by_platform = sort_into_categories(entries, c.valid_platforms, lambda item, category: category in item.get('Platform', []), 'Unspecified')
-    games_by_language = sort_into_categories(entries, c.known_languages, lambda item, category: category in item['Code language'])
-    non_games_by_type = sort_into_categories(non_games, c.non_game_keywords, lambda item, category: category in item['Keyword'])
-
-    # extract top Github stars games
-    Ntop = 100
-    top_games = get_topN_games(games, N=Ntop)
-
-    # base dictionary
-    base = {
-        'title': 'OSGL',
-        'creation-date': datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M'),
-        'css': ['bulma.min.css', 'osgl.min.css'],
-        'js': ['osgl.js']
-    }
-
-    # copy css and js
-    utils.copy_tree(c.web_template_path / 'css', c.web_css_path)
-    utils.copy_tree(c.web_template_path / 'js', c.web_js_path)
-
-    # copy screenshots path
-    filenames = [file.name for file in c.screenshots_path.iterdir() if file.suffix == '.jpg']
-    c.web_screenshots_path.mkdir(parents=True, exist_ok=True)
-    for filename in filenames:
-        shutil.copyfile(c.screenshots_path / filename, c.web_screenshots_path / filename)
+    games_by_genre = games_index.categorize('Keyword', genres, value=str.lower)
+    games_by_platform = entries_index.categorize('Platform', c.valid_platforms, 'Unspecified')
+    games_by_language = entries_index.categorize('Code language', c.known_languages)
+    non_games_by_type = non_games_index.categorize('Keyword', c.non_game_keywords)
+
+    # copy css and js (if changed)
+    for source_path, destination_path in ((c.web_template_path / 'css', c.web_css_path), (c.web_template_path / 'js', c.web_js_path)):
+        for file in source_path.rglob('*'):
+            if file.is_file():
+                destination = destination_path / file.relative_to(source_path)
+                build.output(destination, copy_if_changed(file, destination))
+
+    # copy screenshots path (if changed)
+    for file in c.screenshots_path.iterdir():
+        if file.suffix == '.jpg':
+            build.output(c.web_screenshots_path / file.name, copy_if_changed(file, c.web_screenshots_path / file.name))
 
     # collage_image and google search console token and favicon.svg
     for filename in ('collage_games.jpg', 'google1f8a3863114cbcb3.html', 'favicon.svg'):
-        shutil.copyfile(c.web_template_path / filename, c.web_path / filename)
-
-    # create Jinja Environment
-    environment = Environment(loader=FileSystemLoader(c.web_template_path), autoescape=True)
-    environment.globals['base'] = base
-    environment.globals['raise'] = raise_helper
-    environment.globals['is_list'] = lambda obj: isinstance(obj, list)
+        build.output(c.web_path / filename, copy_if_changed(c.web_template_path / filename, c.web_path / filename))
 
     # multiple times used templates
     template_categorical_index = environment.get_template('categorical_index.jinja')
@@ -1059,13 +1713,13 @@ def generate(entries, inspirations, developers):
     base['active_nav'] = 'index'
     index = {'subtitle': make_text(f'Contains information about {len(games)} open source games and {len(non_games)} game engines/tools.') }
     template = environment.get_template('index.jinja')
-    write(template.render(index=index), ['index.html'])
+    build.page(template, ['index.html'], index=index)
 
     # contribute page
     base['title'] = 'OSGL | Contributions'
     base['active_nav'] = 'contribute'
     template = environment.get_template('contribute.jinja')
-    write(template.render(), ['contribute.html'])
+    build.page(template, ['contribute.html'])
 
     # statistics page in statistics folder
     base['title'] = 'OSGL | Statistics'
@@ -1075,7 +1729,7 @@ def generate(entries, inspirations, developers):
     # statistics preparation
     template = environment.get_template('statistics.jinja')
     # render and write statistics page
-    write(template.render(data=statistics_data), statistics_index_path)
+    build.page(template, statistics_index_path, data=statistics_data)
 
     # non-games folder
     base['title'] = 'OSGL | Game engines, frameworks, tools'
@@ -1091,16 +1745,16 @@ def generate(entries, inspirations, developers):
     index['category-icons'] = {}
     index['number_entries_per_category_threshold'] = 0
     index['category-infos'] = {}
-    write(template_categorical_index.render(index=index), non_games_index_path)
+    build.page(template_categorical_index, non_games_index_path, index=index)
 
     # generate non-games pages
     for keyword in c.non_game_keywords:
         listing = {
             'title': non_game_category_names[keyword],
             'subtitle': make_url(non_games_index_path, 'Index'),
-            'items': non_games_by_type[keyword]
+            'items': [fragment[id(x)] for x in non_games_by_type[keyword]]
         }
-        write(template_listing_entries.render(listing=listing), non_games_path + [f'{keyword}.html'])
+        build.page(template_listing_entries, non_games_path + [f'{keyword}.html'], listing=listing)
 
     # games folder
     base['title'] = 'OSGL | Games | Alphabetical'
@@ -1111,9 +1765,9 @@ def generate(entries, inspirations, developers):
     for letter in extended_alphabet:
         listing = {
             'title': f'Games starting with {letter.capitalize()}',
-            'items': games_by_alphabet[letter]
+            'items': [fragment[id(x)] for x in games_by_alphabet[letter]]
         }
-        write(template_listing_entries.render(listing=listing), games_path + [f'{letter.capitalize()}.html'])
+        build.page(template_listing_entries, games_path + [f'{letter.capitalize()}.html'], listing=listing)
 
     # generate games index
     index = divide_in_three_columns_and_transform(games_by_alphabet, entry_index)
@@ -1124,7 +1778,7 @@ def generate(entries, inspirations, developers):
     index['category-icons'] = {}
     index['number_entries_per_category_threshold'] = 20
     index['category-infos'] = {letter: make_text(f'{len(games_by_alphabet[letter])} games') for letter in extended_alphabet}
-    write(template_categorical_index.render(index=index), games_index_path)
+    build.page(template_categorical_index, games_index_path, index=index)
 
     # genres
     base['title'] = 'OSGL | Games | Genres'
@@ -1137,7 +1791,7 @@ def generate(entries, inspirations, developers):
     index['category-icons'] = {k: make_icon(genre_icon_map[k]) for k in index['categories'] if k in genre_icon_map}
     index['number_entries_per_category_threshold'] = 50
     index['category-infos'] = {genre: make_text(f'{len(games_by_genre[genre])} games') for genre in genres}
-    write(template_categorical_index.render(index=index), games_by_genres_path)
+    build.page(template_categorical_index, games_by_genres_path, index=index)
 
     # games by language
     base['title'] = 'OSGL | Games | Programming language'
@@ -1150,7 +1804,7 @@ def generate(entries, inspirations, developers):
     index['category-icons'] = {}
     index['number_entries_per_category_threshold'] = 15
     index['category-infos'] = {category: make_url(c.language_urls[category], 'Language information', css_class='is-size-7') for category in c.known_languages if category in c.language_urls}
-    write(template_categorical_index.render(index=index), games_by_language_path)
+    build.page(template_categorical_index, games_by_language_path, index=index)
 
     # games by platform
     base['title'] = 'OSGL | Games | Supported Platform'
@@ -1164,7 +1818,7 @@ def generate(entries, inspirations, developers):
     index['number_entries_per_category_threshold'] = 15
     index['category-infos'] = {}
     index['category-infos'] = {category: make_text(f'{len(games_by_platform[category])} entries') for category in index['categories']}
-    write(template_categorical_index.render(index=index), games_by_platform_path)
+    build.page(template_categorical_index, games_by_platform_path, index=index)
 
     # for kids games
     base['title'] = 'OSGL | Games | For Kids'
@@ -1173,9 +1827,9 @@ def generate(entries, inspirations, developers):
     listing = {
         'title': 'Games for Kids',
         'subtitle': f'{len(kids_games)} games suitable for kids.',
-        'items': kids_games
+        'items': [fragment[id(x)] for x in kids_games]
     }
-    write(template_listing_entries.render(listing=listing), games_kids_path)
+    build.page(template_listing_entries, games_kids_path, listing=listing)
 
     # playable in browser
     base['title'] = 'OSGL | Games | Web play'
@@ -1184,9 +1838,9 @@ def generate(entries, inspirations, developers):
     listing = {
         'title': 'Playable browser games',
         'subtitle': f'{len(web_games)} games that can be played in your browser right away.',
-        'items': web_games
+        'items': [fragment[id(x)] for x in web_games]
     }
-    write(template_listing_entries.render(listing=listing), games_web_path)
+    build.page(template_listing_entries, games_web_path, listing=listing)
 
     # completely free games
     base['title'] = 'OSGL | Games | Free code and artwork'
@@ -1195,22 +1849,19 @@ def generate(entries, inspirations, developers):
     listing = {
         'title': 'Completely free games',
         'subtitle': f'{len(libre_games)} games with open/libre code and artwork.',
-        'items': libre_games
+        'items': [fragment[id(x)] for x in libre_games]
     }
-    write(template_listing_entries.render(listing=listing), games_libre_path)
+    build.page(template_listing_entries, games_libre_path, listing=listing)
 
     # top github/gitlab games
     base['title'] = f'OSGL | Games | GitHub Top {Ntop}'
     base['active_nav'] = ['filter', f'top']
-    # there are no other games coming afterward, can actually number them
-    for index, game in enumerate(top_games):
-        game['name'] = f'{index + 1}. ' + game['name']
     listing = {
         'title': f'GitHub/Lab Stars Top {Ntop}',
         'subtitle': f'{Ntop} highest rated (by stars on Github or Gitlab) immediately downloadable and playable open source games in the database.', # that can be played online or downloaded
-        'items': top_games
+        'items': top_fragments
     }
-    write(template_listing_entries.render(listing=listing), games_top_path)
+    build.page(template_listing_entries, games_top_path, listing=listing)
 
     # inspirations folder
     base['title'] = 'OSGL | Inspirational games'
@@ -1224,23 +1875,23 @@ def generate(entries, inspirations, developers):
     for letter in extended_alphabet:
         listing = {
             'title': f'Inspirations ({letter.capitalize()})',
-            'items': inspirations_by_alphabet[letter]
+            'items': [fragment[id(x)] for x in inspirations_by_alphabet[letter]]
         }
-        write(template_listing_inspirations.render(listing=listing), inspirations_path + [f'{letter.capitalize()}.html'])
+        build.page(template_listing_inspirations, inspirations_path + [f'{letter.capitalize()}.html'], listing=listing)
 
     # inspirations index
-    extended_alphabet_names['_'] = 'Most used'
+    category_names = dict(extended_alphabet_names, _='Most used')
     top_inspirations = [inspiration for inspiration in inspirations if len(inspiration['Inspired entries']) >= TOP_INSPIRATION_THRESHOLD]
     inspirations_by_alphabet['_'] = top_inspirations
     index = divide_in_three_columns_and_transform(inspirations_by_alphabet, inspiration_index)
     index['title'] = 'Inspirations'
     index['subtitle'] = make_text(f'Alphabetical index of {len(inspirations)} games used as inspirations')
     index['categories'] = '_' + extended_alphabet
-    index['category-names'] = extended_alphabet_names
+    index['category-names'] = category_names
     index['category-icons'] = {}
     index['number_entries_per_category_threshold'] = 10
     index['category-infos'] = {}
-    write(template_categorical_index.render(index=index), inspirations_index_path)
+    build.page(template_categorical_index, inspirations_index_path, index=index)
 
     # developers folder
     base['title'] = 'OSGL | Games | Developers'
@@ -1252,23 +1903,23 @@ def generate(entries, inspirations, developers):
     for letter in extended_alphabet:
         listing = {
             'title': f'Open source game developers ({letter.capitalize()})',
-            'items': developers_by_alphabet[letter]
+            'items': [fragment[id(x)] for x in developers_by_alphabet[letter]]
         }
-        write(template_listing_developers.render(listing=listing), developers_path + [f'{letter.capitalize()}.html'])
+        build.page(template_listing_developers, developers_path + [f'{letter.capitalize()}.html'], listing=listing)
 
     # developers index
-    extended_alphabet_names['_'] = 'Most active'
+    category_names = dict(extended_alphabet_names, _='Most active')
     top_developers = [developer for developer in developers if len(developer['Games']) >= TOP_DEVELOPER_THRESHOLD]
     developers_by_alphabet['_'] = top_developers
     index = divide_in_three_columns_and_transform(developers_by_alphabet, developer_index)
     index['title'] = 'Open source game developers'
     index['subtitle'] = make_text(f'Alphabetical index of {len(developers)} developers')
     index['categories'] = '_' + extended_alphabet
-    index['category-names'] = extended_alphabet_names
+    index['category-names'] = category_names
     index['category-icons'] = {}
     index['number_entries_per_category_threshold'] = 10
     index['category-infos'] = {}
-    write(template_categorical_index.render(index=index), developers_index_path)
+    build.page(template_categorical_index, developers_index_path, index=index)
 
     # dynamic table (is in top level folder)
     base['title'] = 'OSGL | Entries | Table'
@@ -1277,51 +1928,63 @@ def generate(entries, inspirations, developers):
     base['js'].append('simple-datatables.js')
     base['active_nav'] = 'table'
     template = environment.get_template('table.jinja')
-    index['tags'] = make_text(', '.join(c.interesting_keywords))
-    index['platforms'] = make_text(', '.join(c.valid_platforms))
-    write(template.render(index=index), ['table.html'])
+    index = dict(index, tags=make_text(', '.join(c.interesting_keywords)), platforms=make_text(', '.join(c.valid_platforms)))
+    build.page(template, ['table.html'], index=index)
+
+    # render all pages that are not up to date
+    processes = build.render(parallel)
+    print(f'{build.rendered} pages rendered ({processes} process(es), {build.unchanged} of them unchanged), {build.skipped} pages up to date')
+    print(f'{build.validated} pages validated, {build.not_validated} pages not validated yet')
+    print(f'{build.fragments_rendered} fragments rendered, {len(build.fragments) - build.fragments_rendered} fragments cached')
+    print('\n'.join(build.size_report()))
+
+    # remove everything this build did not produce
+    build.prune()
+    build.save()
+    print(', '.join(f'{number} files {kind} ({size / 1e6:.1f} MB)' for kind, (number, size) in build.sync.items()))
+    print('timing: ' + ', '.join(f'{stage} {seconds * 1000:.0f}ms' for stage, seconds in build.times.items()))
 
 
 if __name__ == "__main__":
 
     start_time = time.process_time()
 
-    # create dictionary of file hashes
-    print('estimate file hashes')
-    for dirpath, dirnames, filenames in c.web_path.walk():  # TODO in Python 3.12 Path.walk() exists
-        for filename in filenames:
-            if any(filename.endswith(ext) for ext in ('.html', '.svg')):
-                filename = dirpath / filename
-                text = utils.read_text(filename)
-                previous_files[filename] = {'hash': file_hash(text), 'text': text}
+    # fast mode
+    validation_sample = None
+    for argument in sys.argv[1:]:
+        if argument.startswith('--fast'):
+            validation_sample = int(argument.partition('=')[2] or VALIDATION_SAMPLE)
+
+    # the source files changed since the last generation, only reported: the build always runs, because it also repairs
+    # changes of the output directory (missing or modified pages, see Build) and is fast if nothing changed
+    print(osg_changes.change_set('website'))
 
-    # clean the output directory
-    print('clean current static website')
-    utils.recreate_directory(c.web_path)
+    # the output directory is not cleaned, only changed files are written and stale files are removed at the end
+    c.web_path.mkdir(exist_ok=True)
 
     # load entries, inspirations and developers and sort them alphabetically
     print('load entries, inspirations and developers')
-    entries = osg.read_entries()
-    entries.sort(key=lambda x: str.casefold(x['Title']))
+    entries, developers, inspirations = osg.read_snapshot(parallel=True)
+    entries = sorted(entries, key=lambda x: str.casefold(x['Title']))
 
     # add screenshot information
     add_screenshot_information(entries)
 
-    inspirations = osg.read_inspirations()
-    inspirations = list(inspirations.values())
-    inspirations.sort(key=lambda x: str.casefold(x['Name']))
+    inspirations = sorted(inspirations.values(), key=lambda x: str.casefold(x['Name']))
     # remove orphaned inspirations for the website creation
     inspirations = [inspiration for inspiration in inspirations if inspiration['Inspired entries']]
 
-    developers = osg.read_developers()
-    developers = list(developers.values())
-    developers.sort(key=lambda x: str.casefold(x['Name']))
+    developers = sorted(developers.values(), key=lambda x: str.casefold(x['Name']))
     # remove orphaned developers for the website creation
     developers = [developer for developer in developers if developer['Games']]
 
     # re-generate static website
     print('re-generate static website')
-    generate(entries, inspirations, developers)
+    generate(entries, inspirations, developers, parallel=True, validation_sample=validation_sample)
+    if validation_sample is None:  # otherwise not yet done, the next build validates the remaining pages
+        osg_changes.mark_processed('website')
 
     # timing
-    print(f'took {time.process_time() - start_time:.3f}s')
\ No newline at end of file
+    print(f'took {time.process_time() - start_time:.3f}s')
+    if resource is not None:
+        print(f'peak memory {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB')  # in kilobytes on Linux
\ No newline at end of file
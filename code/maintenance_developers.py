@@ -12,7 +12,7 @@ stored Git repositories.
 # TODO link check also for developers (also similar links w/wo slash at the end or http(s))
 
 import time
-from utils import osg, osg_ui
+from utils import osg, osg_ui, osg_graph
 
 
 class DevelopersMaintainer:
@@ -51,9 +51,9 @@ class DevelopersMaintainer:
         if not self.developers:
             print('developers not yet loaded')
             return
-        for dev in self.developers.values():
-            if not dev['Games']:
-                print(f" {dev['Name']} has no games")
+        references = osg_graph.CrossReferences(self.entries or [], developers=self.developers)
+        for name in references.orphans('developer'):
+            print(f" {name} has no games")
         print('orphans checked')
 
     def remove_orphans(self):
@@ -73,17 +73,18 @@ class DevelopersMaintainer:
         if not self.entries:
             print('entries not yet loaded')
             return
-        for dev in self.developers.values():
-            dev_name = dev['Name']
-            for entry_name in dev['Games']:
-                x = [x for x in self.entries if x['Title'] == entry_name]
-                assert len(x) <= 1
-                if not x:
-                    print(f'Entry "{entry_name}" listed as game of developer "{dev_name}" but this entry does not exist')
-                else:
-                    entry = x[0]
-                    if 'Developer' not in entry or dev_name not in entry['Developer']:
-                        print(f'Entry "{entry_name}" listed in developer "{dev_name}" but not listed in that entry')
+        references = osg_graph.CrossReferences(self.entries, developers=self.developers)
+        # games listed in the developers
+        for dev_name, entry_name, problem in references.missing_links('developer'):
+            if problem == 'missing entry':
+                print(f'Entry "{entry_name}" listed as game of developer "{dev_name}" but this entry does not exist')
+            elif problem == 'ambiguous entry':
+                print(f'Multiple entries "{entry_name}" listed as game of developer "{dev_name}", expect exactly one.')
+            else:
+                print(f'Entry "{entry_name}" listed in developer "{dev_name}" but not listed in that entry')
+        # developers listed in the entries
+        for dev_name, entry_name in references.unlisted_references('developer'):
+            print(f'Entry "{entry_name}" lists developer "{dev_name}" but is not listed there')
         print('missed developer checked')
 
     def update_developers_from_entries(self):
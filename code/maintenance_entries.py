@@ -33,7 +33,7 @@ import pathlib
 import re
 import datetime
 import json
-from utils import osg, osg_ui, osg_parse, utils, constants as c
+from utils import osg, osg_ui, osg_parse, osg_changes, utils, constants as c
 import requests
 
 
@@ -98,6 +98,14 @@ def sort_text_file(file, name):
     utils.write_text(file, text)
 
 
+def frequencies(counts):
+    """
+    Given a mapping value -> number of occurrences, returns a list of tuples (value, relative frequency).
+    """
+    total = sum(counts.values())
+    return [(value, number / total) for value, number in counts.items()]
+
+
 class EntriesMaintainer:
 
     def __init__(self):
@@ -140,19 +148,22 @@ class EntriesMaintainer:
         if not self.entries:
             print('entries not yet loaded')
             return
+        entry_index = osg.index_entries(self.entries)
+
         # get all keywords and print similar keywords
-        keywords = []
-        for entry in self.entries:
-            keywords.extend(entry['Keyword'])
-            if b'first\xe2\x80\x90person'.decode() in entry['Keyword']:
-                print(entry['File'])
+        for entry in entry_index.select(('Keyword', b'first\xe2\x80\x90person'.decode())):
+            print(entry['File'])
 
         # reduce those starting with "multiplayer"
-        keywords = [x if not x.startswith('multiplayer') else 'multiplayer' for x in keywords]
+        keywords = {}
+        for keyword, number in entry_index.counts('Keyword').items():
+            if keyword.startswith('multiplayer'):
+                keyword = 'multiplayer'
+            keywords[keyword] = keywords.get(keyword, 0) + number
 
         # check unique keywords
-        unique_keywords = list(set(keywords))
-        unique_keywords_counts = [keywords.count(l) for l in unique_keywords]
+        unique_keywords = list(keywords.keys())
+        unique_keywords_counts = list(keywords.values())
         for index, name in enumerate(unique_keywords):
             for other_index in range(index+1, len(unique_keywords)):
                 other_name = unique_keywords[other_index]
@@ -160,24 +171,16 @@ class EntriesMaintainer:
                     print(f' Keywords {name} ({unique_keywords_counts[index]}) - {other_name} ({unique_keywords_counts[other_index]}) are similar')
 
         # get all names of frameworks and library also using osg.code_dependencies_aliases
-        valid_dependencies = list(c.general_code_dependencies_without_entry.keys())
-        for entry in self.entries:
-            if any((x in ('framework', 'library', 'game engine') for x in entry['Keyword'])):
-                name = entry['Title']
-                if name in c.code_dependencies_aliases:
-                    valid_dependencies.extend(c.code_dependencies_aliases[name])
-                else:
-                    valid_dependencies.append(name)
+        valid_dependencies = set(c.general_code_dependencies_without_entry.keys())
+        for entry in entry_index.select(osg.any_of('Keyword', ('framework', 'library', 'game engine'))):
+            name = entry['Title']
+            if name in c.code_dependencies_aliases:
+                valid_dependencies.update(c.code_dependencies_aliases[name])
+            else:
+                valid_dependencies.add(name)
 
         # get all referenced code dependencies
-        referenced_dependencies = {}
-        for entry in self.entries:
-            deps = entry.get('Code dependency', [])
-            for dependency in deps:
-                if dependency in referenced_dependencies:
-                    referenced_dependencies[dependency] += 1
-                else:
-                    referenced_dependencies[dependency] = 1
+        referenced_dependencies = entry_index.counts('Code dependency')
 
         # delete those that are valid dependencies
         referenced_dependencies = [(k, v) for k, v in referenced_dependencies.items() if k not in valid_dependencies]
@@ -201,12 +204,11 @@ class EntriesMaintainer:
 
         # javascript/typescript/php as language but not web as platform?
         ignored = ('0_ad.md', 'aussenposten.md', 'between.md', 'caesaria.md', 'cavepacker.md', 'citybound.md', 'gorillas.md', 'ika.md', 'inexor.md', 'maniadrive.md', 'oolite.md', 'freevikings.md', 'rolisteam.md', 'rpgboss.md', 'ruby-warrior.md', 'snelps.md', 'tenes_empanadas_graciela.md', 'thrive.md')
-        for entry in self.entries:
+        for entry in entry_index.select(('and', osg.any_of('Code language', ('JavaScript', 'TypeScript', 'PHP', 'CoffeeScript')), ('not', ('Platform', 'Web')))):
             name = entry['File']
             if name in ignored:
                 continue
-            if any(language in entry['Code language'] for language in ('JavaScript', 'TypeScript', 'PHP', 'CoffeeScript')) and ('Platform' not in entry or 'Web' not in entry['Platform']):
-                print(f'Entry "{name}" has language JavaScript/PHP but not Web as platform.')
+            print(f'Entry "{name}" has language JavaScript/PHP but not Web as platform.')
 
         # space in name but not space as keyword
         ignored = ('burgerspace.md', 'crystal_space_3d_sdk.md', 'our_personal_space.md', 'space_harrier_clone.md')
@@ -432,11 +434,13 @@ class EntriesMaintainer:
 
         tocs_text = ''
 
+        index = osg.index_entries(self.entries)
+
         # split into games, tools, frameworks, libraries
-        games = [x for x in self.entries if not any([y in x['Keyword'] for y in ('tool', 'framework', 'library')])]
-        tools = [x for x in self.entries if 'tool' in x['Keyword']]
-        frameworks = [x for x in self.entries if 'framework' in x['Keyword']]
-        libraries = [x for x in self.entries if 'library' in x['Keyword']]
+        games = index.select(('not', osg.any_of('Keyword', ('tool', 'framework', 'library'))))
+        tools = index.select(('Keyword', 'tool'))
+        frameworks = index.select(('Keyword', 'framework'))
+        libraries = index.select(('Keyword', 'library'))
         
         # create games, tools, frameworks, libraries tocs
         title = 'Games'
@@ -462,7 +466,7 @@ class EntriesMaintainer:
         # create by category
         categories_text = []
         for keyword in c.recommended_keywords:
-            filtered = [x for x in self.entries if keyword in x['Keyword']]
+            filtered = index.select(('Keyword', keyword))
             title = keyword.capitalize()
             name = keyword.replace(' ', '-')
             file = f'_{name}.md'
@@ -474,7 +478,7 @@ class EntriesMaintainer:
         # create by platform
         platforms_text = []
         for platform in c.valid_platforms:
-            filtered = [x for x in self.entries if platform in x.get('Platform', [])]
+            filtered = index.select(('Platform', platform))
             title = platform
             name = platform.lower()
             file = f'_{name}.md'
@@ -500,6 +504,8 @@ class EntriesMaintainer:
             print('entries not yet loaded')
             return
 
+        index = osg.index_entries(self.entries)
+
         # start the page
         statistics = '[comment]: # (autogenerated content, do not edit)\n# Statistics\n\n'
 
@@ -513,15 +519,15 @@ class EntriesMaintainer:
         # State (beta, mature, inactive)
         statistics += '## State\n\n'
 
-        number_state_beta = sum(1 for x in self.entries if 'beta' in x['State'])
-        number_state_mature = sum(1 for x in self.entries if 'mature' in x['State'])
-        number_inactive = sum(1 for x in self.entries if osg.is_inactive(x))
+        number_state_beta = index.count(('State', 'beta'))
+        number_state_mature = index.count(('State', 'mature'))
+        number_inactive = index.count(osg.inactive_query(index))
         statistics += '- mature: {} ({:.1f}%)\n- beta: {} ({:.1f}%)\n- inactive: {} ({:.1f}%)\n\n'.format(
             number_state_mature, rel(number_state_mature), number_state_beta, rel(number_state_beta), number_inactive,
             rel(number_inactive))
 
         if number_inactive > 0:
-            entries_inactive = [(x['Title'], osg.extract_inactive_year(x)) for x in self.entries if osg.is_inactive(x)]
+            entries_inactive = [(x['Title'], osg.extract_inactive_year(x)) for x in index.select(osg.inactive_query(index))]
             entries_inactive.sort(key=lambda x: str.casefold(x[0]))  # first sort by name
             entries_inactive.sort(key=lambda x: x[1], reverse=True)  # then sort by inactive year (more recently first)
             entries_inactive = ['{} ({})'.format(*x) for x in entries_inactive]
@@ -531,13 +537,7 @@ class EntriesMaintainer:
         statistics += '## Code Languages\n\n'
         field = 'Code language'
 
-        # get all languages together
-        languages = []
-        for entry in self.entries:
-            languages.extend(entry[field])
-
-        unique_languages = set(languages)
-        unique_languages = [(l, languages.count(l) / len(languages)) for l in unique_languages]
+        unique_languages = frequencies(index.counts(field))
         unique_languages.sort(key=lambda x: str.casefold(x[0]))  # first sort by name
 
         # print languages to console
@@ -552,13 +552,7 @@ class EntriesMaintainer:
         statistics += '## Code licenses\n\n'
         field = 'Code license'
 
-        # get all licenses together
-        licenses = []
-        for entry in self.entries:
-            licenses.extend(entry[field])
-
-        unique_licenses = set(licenses)
-        unique_licenses = [(l, licenses.count(l) / len(licenses)) for l in unique_licenses]
+        unique_licenses = frequencies(index.counts(field))
         unique_licenses.sort(key=lambda x: str.casefold(x[0]))  # first sort by name
 
         # print licenses to console
@@ -573,19 +567,17 @@ class EntriesMaintainer:
         statistics += '## Keywords\n\n'
         field = 'Keyword'
 
-        # get all keywords together
-        keywords = []
-        for entry in self.entries:
-            keywords.extend(entry[field])
-
-        # reduce those starting with "multiplayer"
-        keywords = [x if not x.startswith('multiplayer') else 'multiplayer' for x in keywords]
-
-        # for content keyword filter out everything in parentheses
-        keywords = [x if not any(x.startswith(y) for y in ('content', 'original required')) else re.sub(r'\(.*?\)\s*', '', x) for x in keywords]
-
-        unique_keywords = set(keywords)
-        unique_keywords = [(l, keywords.count(l) / len(keywords)) for l in unique_keywords]
+        keywords = {}
+        for keyword, number in index.counts(field).items():
+            # reduce those starting with "multiplayer"
+            if keyword.startswith('multiplayer'):
+                keyword = 'multiplayer'
+            # for content keyword filter out everything in parentheses
+            if any(keyword.startswith(y) for y in ('content', 'original required')):
+                keyword = re.sub(r'\(.*?\)\s*', '', keyword)
+            keywords[keyword] = keywords.get(keyword, 0) + number
+
+        unique_keywords = frequencies(keywords)
         unique_keywords.sort(key=lambda x: str.casefold(x[0]))  # first sort by name
 
         # print keywords to console
@@ -630,19 +622,11 @@ class EntriesMaintainer:
         statistics += '## Code dependencies\n\n'
         field = 'Code dependency'
 
-        # get all code dependencies together
-        code_dependencies = []
-        entries_with_code_dependency = 0
-        for entry in self.entries:
-            if field in entry:
-                code_dependencies.extend(entry[field])
-                entries_with_code_dependency += 1
+        entries_with_code_dependency = index.count(osg.any_of(field, index.values(field)))
         statistics += 'With code dependency field {} ({:.1f}%)\n\n'.format(entries_with_code_dependency,
                                                                            rel(entries_with_code_dependency))
 
-        unique_code_dependencies = set(code_dependencies)
-        unique_code_dependencies = [(l, code_dependencies.count(l) / len(code_dependencies)) for l in
-                                    unique_code_dependencies]
+        unique_code_dependencies = frequencies(index.counts(field))
         unique_code_dependencies.sort(key=lambda x: str.casefold(x[0]))  # first sort by name
 
         # print code dependencies to console
@@ -657,17 +641,13 @@ class EntriesMaintainer:
         statistics += '## Build systems\n\n'
         field = 'Build system'
 
-        # get all build systems together
-        build_systems = []
-        for entry in self.entries:
-            if field in entry['Building']:
-                build_systems.extend(entry['Building'][field])
+        build_systems = index.counts(field)
+        number_build_systems = sum(build_systems.values())
 
         statistics += 'Build systems information available for {:.1f}% of all projects.\n\n'.format(
-            rel(len(build_systems)))
+            rel(number_build_systems))
 
-        unique_build_systems = set(build_systems)
-        unique_build_systems = [(l, build_systems.count(l) / len(build_systems)) for l in unique_build_systems]
+        unique_build_systems = frequencies(build_systems)
         unique_build_systems.sort(key=lambda x: str.casefold(x[0]))  # first sort by name
 
         # print build systems to console
@@ -676,13 +656,13 @@ class EntriesMaintainer:
 
         unique_build_systems.sort(key=lambda x: -x[1])  # then sort by occurrence (highest occurrence first)
         unique_build_systems = [f'- {x[0]} ({x[1] * 100:.1f}%)' for x in unique_build_systems]
-        statistics += f'##### Build systems frequency ({len(build_systems)})\n\n' + '\n'.join(
+        statistics += f'##### Build systems frequency ({number_build_systems})\n\n' + '\n'.join(
             unique_build_systems) + '\n\n'
 
         # C, C++ projects without build system information
         c_cpp_project_without_build_system = []
-        for entry in self.entries:
-            if field not in entry and ('C' in entry['Code language'] or 'C++' in entry['Code language']):
+        for entry in index.select(osg.any_of('Code language', ('C', 'C++'))):
+            if field not in entry:
                 c_cpp_project_without_build_system.append(entry['Title'])
         c_cpp_project_without_build_system.sort(key=str.casefold)
         statistics += '##### C and C++ projects without build system information ({})\n\n'.format(
@@ -702,16 +682,11 @@ class EntriesMaintainer:
         statistics += '## Platform\n\n'
         field = 'Platform'
 
-        # get all platforms together
-        platforms = []
-        for entry in self.entries:
-            if field in entry:
-                platforms.extend(entry[field])
+        platforms = index.counts(field)
 
-        statistics += f'Platform information available for {rel(len(platforms)):.1f}% of all projects.\n\n' # TODO this is a simple error, we should not take the number of platforms :D
+        statistics += f'Platform information available for {rel(sum(platforms.values())):.1f}% of all projects.\n\n' # TODO this is a simple error, we should not take the number of platforms :D
 
-        unique_platforms = set(platforms)
-        unique_platforms = [(l, platforms.count(l) / len(platforms)) for l in unique_platforms]
+        unique_platforms = frequencies(platforms)
         unique_platforms.sort(key=lambda x: str.casefold(x[0]))  # first sort by name
         unique_platforms.sort(key=lambda x: -x[1])  # then sort by occurrence (highest occurrence first)
         unique_platforms = [f'- {x[0]} ({x[1] * 100:.1f}%)' for x in unique_platforms]
@@ -903,8 +878,42 @@ class EntriesMaintainer:
 
         print('special ops finished')
 
+    def check_changed_entries(self, changes=None):
+        """
+        Parses and checks only the entry files that changed since the last complete run (see osg_changes).
+
+        :return: True if all of them are fine
+        """
+        if changes is None:
+            changes = osg_changes.change_set('entries maintenance')
+        files = osg.entry_iterator() if changes.complete else ((file, file.name, None) for file in changes.entry_files())
+        okay = True
+        number = 0
+        for file, _, _ in files:
+            number += 1
+            try:
+                osg.read_entry(file)  # prints the problems itself
+            except RuntimeError:
+                okay = False
+        print(f'{number} changed entries checked, {"all fine" if okay else "with problems"}')
+        return okay
+
     def complete_run(self):
-        pass
+        """
+        Checks the entries changed since the last complete run. Readme, TOCs and statistics are summaries of all entries
+        and are therefore updated from all entries, but only if any entry (or the code) changed.
+        """
+        changes = osg_changes.change_set('entries maintenance')
+        print(changes)
+        if not changes:
+            return
+        if not self.check_changed_entries(changes):
+            return
+        if changes.complete or changes.entries:
+            self.read_entries()
+            self.update_readme_tocs()
+            self.update_statistics()
+        osg_changes.mark_processed('entries maintenance')
 
 
 if __name__ == "__main__":
@@ -916,6 +925,7 @@ if __name__ == "__main__":
         'Write entries': m.write_entries,
         'Check template leftovers': m.check_template_leftovers,
         'Check inconsistencies': m.check_inconsistencies,
+        'Check changed entries': m.check_changed_entries,
         'Check rejected entries': m.clean_rejected,
         'Check external links (takes quite long)': m.check_external_links,
         'Clean backlog': m.clean_backlog,
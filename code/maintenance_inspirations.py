@@ -10,7 +10,7 @@ Maintenance of inspirations.md and synchronization with the inspirations in the
 # TODO link check
 
 import time
-from utils import osg, osg_ui, osg_wikipedia, constants as c
+from utils import osg, osg_ui, osg_wikipedia, osg_graph, constants as c
 
 valid_duplicates = ('Age of Empires', 'ARMA', 'Catacomb', 'Civilization', 'Company of Heroes', 'Descent', 'Duke Nukem', 'Dungeon Keeper',
                     'Final Fantasy', 'Heroes of Might and Magic', 'Jazz Jackrabbit', 'Marathon', 'Master of Orion', 'Quake',
@@ -65,9 +65,9 @@ class InspirationMaintainer:
         if not self.inspirations:
             print('inspirations not yet loaded')
             return
-        for inspiration in self.inspirations.values():
-            if not inspiration['Inspired entries']:
-                print(f" {inspiration['Name']} has no inspired entries")
+        references = osg_graph.CrossReferences(self.entries or [], inspirations=self.inspirations)
+        for name in references.orphans('inspiration'):
+            print(f" {name} has no inspired entries")
         print('orphanes checked')
 
     def check_for_missing_inspirations_in_entries(self):
@@ -80,20 +80,18 @@ class InspirationMaintainer:
         if not self.entries:
             print('entries not yet loaded')
             return
-        # loop over all inspirations
-        for inspiration in self.inspirations.values():
-            inspiration_name = inspiration['Name']
-            # loop over all entry names stored in that inspiration
-            for entry_name in inspiration['Inspired entries']:
-                # get all these entries
-                x = [x for x in self.entries if x['Title'] == entry_name]
-                assert len(x) <= 1, f'{len(x)} entries found for inspiration "{inspiration_name}" with listed inspired entry "{entry_name}", expect exactly one.'
-                if not x:
-                    print(f'Entry "{entry_name}" listed in inspiration "{inspiration_name}" but this entry does not exist')
-                else:
-                    entry = x[0]
-                    if 'Inspiration' not in entry or inspiration_name not in entry['Inspiration']:
-                        print(f'Entry "{entry_name}" listed in inspiration "{inspiration_name}" but not listed in this entry')
+        references = osg_graph.CrossReferences(self.entries, inspirations=self.inspirations)
+        # entries listed in the inspirations
+        for inspiration_name, entry_name, problem in references.missing_links('inspiration'):
+            if problem == 'missing entry':
+                print(f'Entry "{entry_name}" listed in inspiration "{inspiration_name}" but this entry does not exist')
+            elif problem == 'ambiguous entry':
+                print(f'Multiple entries found for inspiration "{inspiration_name}" with listed inspired entry "{entry_name}", expect exactly one.')
+            else:
+                print(f'Entry "{entry_name}" listed in inspiration "{inspiration_name}" but not listed in this entry')
+        # inspirations listed in the entries
+        for inspiration_name, entry_name in references.unlisted_references('inspiration'):
+            print(f'Entry "{entry_name}" lists inspiration "{inspiration_name}" but is not listed there')
         print('missed inspirations in entries checked')
 
     def check_for_wikipedia_links(self):
@@ -145,12 +143,11 @@ class InspirationMaintainer:
         if not self.entries:
             print('entries not yet loaded')
             return
-        # get all entry names
-        entry_names = [entry['Title'] for entry in self.entries]
+        references = osg_graph.CrossReferences(self.entries)
         # loop over all inspirations
         for inspiration in self.inspirations.values():
             name = inspiration['Name']
-            included = name in entry_names and name not in inspiration['Inspired entries']
+            included = references.is_entry(name) and name not in inspiration['Inspired entries']
             if included:
                 if 'Included' not in inspiration:
                     print(f'{name} is included but was not marked as such')
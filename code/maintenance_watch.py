@@ -0,0 +1,219 @@
+"""
+Watches the entries, developers.md and inspirations.md while curating and validates every change right away. The
+database is loaded once, afterwards only changed entry files are parsed and checked again (osg.read_entry, which also
+runs osg.check_and_process_entry) and only the cross-references of the changed entries are checked (osg_graph).
+
+Uses inotify (Linux) and falls back to polling the modification times elsewhere. Run from the code folder and stop
+with Ctrl+C:
+
+    python maintenance_watch.py [--poll]
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from utils import osg, osg_graph, constants as c
+
+# seconds between two checks if polling
+poll_interval = 0.5
+
+# seconds to wait for more changes after a change (editors often write files in several steps)
+settle_time = 0.05
+
+# the watched listings by file name
+listing_files = {c.developer_file.name: 'developer', c.inspirations_file.name: 'inspiration'}
+
+
+def is_entry_file(path):
+    """
+    Entry files, without temporary or hidden files of editors (or of utils.write_text_if_changed).
+    """
+    return path.parent == c.entries_path and path.suffix == '.md' and not path.name.startswith('.')
+
+
+def is_watched_file(path):
+    return is_entry_file(path) or (path.parent == c.root_path and path.name in listing_files)
+
+
+class InotifyWatcher:
+    """
+    Watches the folders of the entries and of the listings with inotify (see inotify(7)). Watching the folders instead
+    of the files also catches editors that save by replacing the file.
+    """
+
+    IN_CLOSE_WRITE = 0x08
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_DELETE = 0x200
+    IN_NONBLOCK = 0o4000
+    header = struct.Struct('iIII')  # wd, mask, cookie, len (followed by the name)
+
+    def __init__(self, folders):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.folders = {}
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_FROM | self.IN_MOVED_TO | self.IN_DELETE
+        for folder in folders:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(folder), mask)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch failed for {folder}')
+            self.folders[wd] = folder
+
+    def wait(self):
+        """
+        Blocks until files changed and returns the set of changed files.
+        """
+        changed = set()
+        timeout = None
+        while True:
+            readable, _, _ = select.select([self.fd], [], [], timeout)
+            if not readable:
+                return changed
+            data = os.read(self.fd, 65536)
+            offset = 0
+            while offset < len(data):
+                wd, _, _, length = self.header.unpack_from(data, offset)
+                offset += self.header.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if name and wd in self.folders:
+                    changed.add(self.folders[wd] / os.fsdecode(name))
+            timeout = settle_time
+
+
+class PollingWatcher:
+    """
+    Compares modification times and sizes of the watched files regularly.
+    """
+
+    def __init__(self, folders):
+        self.folders = folders
+        self.state = self.snapshot()
+
+    def snapshot(self):
+        state = {}
+        for folder in self.folders:
+            for entry in os.scandir(folder):
+                if entry.is_file():
+                    stat = entry.stat()
+                    state[folder / entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return state
+
+    def wait(self):
+        """
+        Blocks until files changed and returns the set of changed files.
+        """
+        while True:
+            time.sleep(poll_interval)
+            state = self.snapshot()
+            changed = {path for path in state.keys() | self.state.keys() if state.get(path) != self.state.get(path)}
+            self.state = state
+            if changed:
+                return changed
+
+
+class DatabaseWatcher:
+    """
+    Keeps the entries, developers, inspirations and their cross-references in memory and updates them on changes.
+    """
+
+    def __init__(self):
+        start_time = time.perf_counter()
+        self.entries = {entry['File'].name: entry for entry in osg.read_entries()}
+        self.listings = {'developer': osg.read_developers(), 'inspiration': osg.read_inspirations()}
+        self.references = osg_graph.CrossReferences(self.entries.values(), **{f'{kind}s': listing for kind, listing in self.listings.items()})
+        print(f'{len(self.entries)} entries, {len(self.listings["developer"])} developers and {len(self.listings["inspiration"])} inspirations loaded ({time.perf_counter() - start_time:.1f}s)')
+
+    def entry_changed(self, file):
+        """
+        Parses and checks a changed (or new or deleted) entry file and checks the cross-references of the entry.
+        """
+        titles = []
+        old_entry = self.entries.pop(file.name, None)
+        if old_entry:
+            self.references.remove_entry(old_entry)
+            titles.append(old_entry['Title'])
+
+        if file.exists():
+            try:
+                entry = osg.read_entry(file)  # prints the errors itself
+            except RuntimeError:
+                entry = old_entry  # keep the last valid state for the cross-references
+            except (OSError, UnicodeDecodeError) as e:  # removed in the meantime or not readable
+                print(f'{file.name} - {e}')
+                entry = old_entry
+            if entry:
+                self.entries[file.name] = entry
+                self.references.add_entry(entry)
+                if entry['Title'] not in titles:
+                    titles.append(entry['Title'])
+            if entry is old_entry:
+                return False
+        else:
+            print(f'{file.name} deleted')
+
+        problems = False
+        for title in titles:
+            for kind, name, problem in self.references.entry_problems(title):
+                print(f'{file.name}: "{title}" - {kind} "{name}": {problem}')
+                problems = True
+        return not problems
+
+    def listing_changed(self, kind):
+        """
+        Reads a changed developers or inspirations file and checks all its cross-references.
+        """
+        try:
+            listing = osg.read_developers() if kind == 'developer' else osg.read_inspirations()
+        except Exception as e:
+            print(f'{kind}s - {e}')
+            return False
+        self.listings[kind] = listing
+        self.references.set_listing(kind, listing)
+
+        problems = [f'{kind} "{name}" - "{title}": {problem}' for name, title, problem in self.references.missing_links(kind)]
+        problems.extend(f'"{title}" - {kind} "{name}": entry not listed' for name, title in self.references.unlisted_references(kind))
+        if problems:
+            print('\n'.join(problems))
+        print(f'{len(listing)} {kind}s read, {len(self.references.orphans(kind))} without entries')
+        return not problems
+
+    def changed(self, files):
+        for file in sorted(files):
+            start_time = time.perf_counter()
+            if file.name in listing_files and file.parent == c.root_path:
+                okay = self.listing_changed(listing_files[file.name])
+            else:
+                okay = self.entry_changed(file)
+            print(f'{file.name} {"okay" if okay else "has problems"} ({(time.perf_counter() - start_time) * 1000:.0f}ms)')
+
+
+if __name__ == "__main__":
+
+    watcher = DatabaseWatcher()
+
+    folders = [c.entries_path, c.root_path]
+    if '--poll' in sys.argv or not sys.platform.startswith('linux'):
+        observer = PollingWatcher(folders)
+    else:
+        try:
+            observer = InotifyWatcher(folders)
+        except (OSError, AttributeError) as e:  # AttributeError if the C library has no inotify
+            print(f'inotify not available ({e}), polling instead')
+            observer = PollingWatcher(folders)
+    print(f'watching for changes ({type(observer).__name__}), stop with Ctrl+C')
+
+    try:
+        while True:
+            files = {file for file in observer.wait() if is_watched_file(file)}
+            if files:
+                watcher.changed(files)
+    except KeyboardInterrupt:
+        pass
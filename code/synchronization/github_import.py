@@ -48,7 +48,7 @@ def collect_github_entries():
     """
 
     # read entries
-    entries = osg.read_entries()
+    entries = osg.read_entries(fields=('Code repository',))
     print(f'{len(entries)} entries read')
 
     # loop over entries
@@ -39,7 +39,7 @@ def collect_sourceforge_entries():
     """
 
     # read entries
-    entries = osg.read_entries()
+    entries = osg.read_entries(fields=('Home',))
     print(f'{len(entries)} entries read')
 
     # loop over entries
@@ -0,0 +1,35 @@
+"""
+Updates the local SQLite database of entries, developers, inspirations and screenshots (see utils/osg_database.py)
+incrementally from the files and optionally runs a full text search or a SQL query on it. Run from the code folder:
+
+    python update_database.py                              only updates
+    python update_database.py search "space AND trading"   full text search (FTS5 syntax) over titles, notes, keywords
+    python update_database.py sql "SELECT ..."             any query
+"""
+
+import sys
+import time
+
+from utils import osg_database, constants as c
+
+if __name__ == "__main__":
+
+    start_time = time.perf_counter()
+    connection = osg_database.connect()
+    updated, deleted = osg_database.update(connection)
+    print(f'{c.database_file.name}: {updated} files updated, {deleted} deleted ({time.perf_counter() - start_time:.3f}s)')
+
+    if len(sys.argv) == 3:
+        start_time = time.perf_counter()
+        command, query = sys.argv[1:]
+        if command == 'search':
+            rows = osg_database.search(connection, query)
+        elif command == 'sql':
+            rows = connection.execute(query).fetchall()
+        else:
+            raise RuntimeError(f'Unknown command "{command}", use "search" or "sql"')
+        for row in rows:
+            print(' | '.join(str(x) for x in row))
+        print(f'{len(rows)} rows ({(time.perf_counter() - start_time) * 1000:.1f}ms)')
+
+    connection.close()
@@ -19,7 +19,12 @@ web_js_path = web_path / 'js'
 web_screenshots_path = web_path / 'screenshots'
 web_data_path = web_path / 'data'
 
+# local caches (not part of the repository, can always be deleted)
+cache_path = code_path / '.cache'
+
 # files
+entries_grammar_file = code_path / 'grammar_entries.lark'
+listing_grammar_file = code_path / 'grammar_listing.lark'
 private_properties_file = root_path / 'private.properties'
 inspirations_file = root_path / 'inspirations.md'
 developer_file = root_path / 'developers.md'
@@ -29,6 +34,15 @@ rejected_file = code_path / 'rejected.txt'
 statistics_file = root_path / 'statistics.md'
 screenshots_file = screenshots_path / 'README.md'
 json_db_file = root_path / 'docs', 'data.json'
+entries_cache_file = cache_path / 'entries.pickle'
+database_file = cache_path / 'database.sqlite'
+snapshot_file = cache_path / 'snapshot.bin'
+processed_commits_file = cache_path / 'processed_commits.json'
+names_file = cache_path / 'names.json'
+website_build_file = cache_path / 'website.json'
+website_manifest_file = cache_path / 'website_manifest.json'
+website_fragments_file = cache_path / 'website_fragments.json'
+jinja_cache_path = cache_path / 'jinja'
 
 # local config
 local_config_file = root_path / 'local-config.ini'
@@ -67,6 +81,10 @@ valid_building_fields = valid_building_properties + ('Note',)
 # these are the only valid platforms currently (and must be given in this order)
 valid_platforms = ('Windows', 'Linux', 'macOS', 'Android', 'iOS', 'Web')
 
+# values of these fields come from small vocabularies and are shared between all entries (see osg_parse.intern_values)
+vocabulary_fields = ('State', 'Platform', 'Keyword', 'Code language', 'Code license', 'Code dependency', 'Assets license')
+vocabulary_building_fields = ('Build system',)
+
 # these fields are not allowed to have comments
 fields_without_comments = ('Inspiration', 'Play', 'Platform', 'Code dependency')
 
@@ -5,9 +5,12 @@ Specific functions working on the games.
 import re
 import os
 import pathlib
+import pickle
+import concurrent.futures
+from collections.abc import Mapping
 from difflib import SequenceMatcher
 
-from utils import utils, osg_parse, constants as c
+from utils import utils, osg_parse, osg_cache, osg_index, osg_graph, osg_snapshot, constants as c
 
 regex_sanitize_name = re.compile(r"[^A-Za-z 0-9-+]+")
 regex_sanitize_name_space_eater = re.compile(r" +")
@@ -57,15 +60,12 @@ def read_developers():
 
     :return:
     """
-    grammar_file = c.code_path / 'grammar_listing.lark'
-    developers = osg_parse.read_and_parse(c.developer_file, grammar_file, osg_parse.ListingTransformer)
+    developers = osg_parse.read_and_parse(c.developer_file, c.listing_grammar_file, osg_parse.ListingTransformer)
 
     # now developers is a list of dictionaries for every entry with some properties
 
     # check for duplicate names entries
-    names = [dev['Name'] for dev in developers]
-    duplicate_names = (name for name in names if names.count(name) > 1)
-    duplicate_names = set(duplicate_names)  # to avoid duplicates in duplicate_names
+    duplicate_names = osg_graph.duplicates(dev['Name'] for dev in developers)
     if duplicate_names:
         print(f"Warning: duplicate developer names: {', '.join(duplicate_names)}")
 
@@ -147,15 +147,12 @@ def read_inspirations():
     # read inspirations
 
     # read and parse inspirations
-    grammar_file = c.code_path / 'grammar_listing.lark'
-    inspirations = osg_parse.read_and_parse(c.inspirations_file, grammar_file, osg_parse.ListingTransformer)
+    inspirations = osg_parse.read_and_parse(c.inspirations_file, c.listing_grammar_file, osg_parse.ListingTransformer)
 
     # now inspirations is a list of dictionaries for every entry with some properties
 
     # check for duplicate names entries
-    names = [inspiration['Name'] for inspiration in inspirations]
-    duplicate_names = (name for name in names if names.count(name) > 1)
-    duplicate_names = set(duplicate_names)  # to avoid duplicates in duplicate_names
+    duplicate_names = osg_graph.duplicates(inspiration['Name'] for inspiration in inspirations)
     if duplicate_names:
         raise RuntimeError(f"Duplicate inspiration names: {', '.join(duplicate_names)}")
 
@@ -225,38 +222,182 @@ def write_inspirations(inspirations):
     utils.write_text(c.inspirations_file, content)
 
 
-def read_entries():
+def init_entry_parser():
     """
-    Parses all entries and assembles interesting infos about them.
+    Returns the entry parser of the current process, which is set up on first use (also used as initializer of the
+    worker processes).
+    """
+    return osg_parse.get_parser(c.entries_grammar_file, osg_parse.EntryTransformer)
+
+
+def parse_entry(file, content):
+    """
+    Parses and processes the content of a single entry file. Catches all exceptions, so it can be used in worker
+    processes.
+
+    :return: Tuple (entry, None) if successful or (None, exception) otherwise
+    """
+    if not content.endswith('\n'):
+        content += '\n'
+
+    # parse and transform entry content (with the fast reader and only if that gives up with the grammar)
+    try:
+        entry = osg_parse.fast_parse_entry(content)
+        if entry is None:
+            parse = init_entry_parser()
+            entry = parse(content)
+        entry = [('File', file),] + entry  # add file information to the beginning
+        entry = check_and_process_entry(entry)
+    except Exception as e:
+        # exceptions must be sent back from worker processes
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(str(e))
+        return None, e
+    return entry, None
+
+
+def parse_entries(files, parallel=False):
+    """
+    Parses and processes multiple entry files either in this process or spread over a pool of worker processes, each
+    setting up the parser only once.
+
+    :param files: List of (file, content) tuples
+    :param parallel: If True, uses as many worker processes as there are cores
+    :return: List of (entry, exception) tuples in the same order as the files
+    """
+    if not parallel or len(files) < 2:
+        return [parse_entry(*x) for x in files]
+
+    processes = os.cpu_count() or 1
+    chunk_size = max(1, len(files) // (4 * processes))  # a few chunks per process for load balancing
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes, initializer=init_entry_parser) as executor:
+        return list(executor.map(parse_entry, *zip(*files), chunksize=chunk_size))
+
+
+class LazyEntry(Mapping):
+    """
+    Read-only view of an entry that only reads the title and the (selected) properties at the top of the entry file
+    (osg_parse.fast_parse_header). Anything else (note, building section or properties that were not selected) is
+    available too, but the first such access parses, checks and processes the whole entry (as read_entry does).
+    Use entry() to get the full entry (for example to modify and write it).
+    """
+    __slots__ = ('_header', '_fields', '_content', '_entry')
+
+    def __init__(self, file, content, fields=None):
+        self._fields = set(c.valid_properties if fields is None else fields) & set(c.valid_properties)
+        self._content = content
+        self._entry = None
+        header = osg_parse.fast_parse_header(content, self._fields)
+        if header is None:  # unusual content, parse everything right away
+            self._header = {'File': file}
+            self.entry()
+            return
+        self._header = {'File': file, **dict(header)}
+        for field in c.vocabulary_fields:
+            if field in self._header:
+                self._header[field] = osg_parse.intern_values(self._header[field])
+
+    def entry(self):
+        """
+        The full entry (parsed and checked on first call).
+        """
+        if self._entry is None:
+            file = self._header['File']
+            entry, e = parse_entry(file, self._content)
+            if e:
+                raise RuntimeError(f'{file} - {e}')
+            entry.mark_unmodified()
+            self._entry = entry
+            self._content = None
+        return self._entry
+
+    def __getitem__(self, key):
+        if self._entry is None:
+            if key in self._header:
+                return self._header[key]
+            if key in self._fields:  # read from the header and not existing
+                raise KeyError(key)
+        return self.entry()[key]
+
+    def __iter__(self):
+        return iter(self.entry())
+
+    def __len__(self):
+        return len(self.entry())
+
+
+def read_entries(use_cache=True, parallel=False, fields=None):
     """
+    Parses all entries and assembles interesting infos about them.
 
-    # setup parser and transformer
-    grammar_file = c.code_path / 'grammar_entries.lark'
-    grammar = utils.read_text(grammar_file)
-    parse = osg_parse.create(grammar, osg_parse.EntryTransformer)
+    :param use_cache: If True, entries whose file content did not change since the last call are taken from the
+    on-disk cache (see osg_cache) instead of being parsed again.
+    :param parallel: If True, the entries that need to be parsed are parsed in multiple processes.
+    :param fields: If given, only these properties (plus file and title) are read and the entries are returned as
+    LazyEntry (neither cache nor parallel are used then), which is much faster for tools that only need a few fields.
+    """
+    if fields is not None:
+        entries = []
+        exception_happened = None
+        for file, _, content in entry_iterator():
+            try:
+                entries.append(LazyEntry(file, content, fields))
+            except RuntimeError as e:  # unusual content is parsed completely right away (see LazyEntry)
+                print(e)
+                exception_happened = e  # just store last one
+        if exception_happened:
+            print('error(s) while reading entries')
+            raise exception_happened
+        return entries
+
+    # cached entries from the last run
+    cache = osg_cache.load_entries() if use_cache else {}
+
+    # read all entries, unchanged entries are taken from the cache
+    items = []
+    unparsed = []
+    for file, name, content in entry_iterator():
+        content_hash = osg_cache.content_hash(content)
+        cached = cache.get(name)
+        if cached and cached[0] == content_hash:
+            entry = cached[1]
+            entry['File'] = file
+            intern_entry(entry)
+        else:
+            entry = None
+            unparsed.append((file, content))
+        items.append((file, name, content_hash, entry))
+
+    # parse and transform the others
+    results = iter(parse_entries(unparsed, parallel))
 
     # a database of all important infos about the entries
     entries = []
+    updated_cache = {}
 
     # iterate over all entries
     exception_happened = None
-    for file, _, content in entry_iterator():
-
-        if not content.endswith('\n'):
-            content += '\n'
-
-        # parse and transform entry content
-        try:
-            entry = parse(content)
-            entry = [('File', file),] + entry # add file information to the beginning
-            entry = check_and_process_entry(entry)
-        except Exception as e:
-            print(f'{file} - {e}')
-            exception_happened = e # just store last one
-            continue
+    for file, name, content_hash, entry in items:
+        if entry is None:
+            entry, e = next(results)
+            if e:
+                print(f'{file} - {e}')
+                exception_happened = e  # just store last one
+                continue
+            if parallel:
+                intern_entry(entry)  # parsed in another process
 
         # add to list
+        updated_cache[name] = (content_hash, entry)
+        entry.mark_unmodified()
         entries.append(entry)
+
+    # update the cache (before anyone can modify the entries) if anything changed
+    if use_cache and (unparsed or updated_cache.keys() != cache.keys()):
+        osg_cache.save_entries(updated_cache)
+
     if exception_happened:
         print('error(s) while reading entries')
         raise exception_happened
@@ -264,6 +405,25 @@ def read_entries():
     return entries
 
 
+def read_snapshot(parallel=False):
+    """
+    Entries, developers and inspirations from the binary snapshot (see osg_snapshot), which is created (by reading
+    everything) if it is missing or any source file changed. Entries, developers and inspirations are only
+    materialized when they are accessed, so read-only tools start immediately.
+
+    :param parallel: Parse in parallel if the snapshot needs to be created (see read_entries).
+    :return: entries (sequence), developers and inspirations (mappings name -> developer or inspiration)
+    """
+    snapshot = osg_snapshot.load()
+    if snapshot:
+        return snapshot.entries, snapshot.developers, snapshot.inspirations
+    entries = read_entries(parallel=parallel)
+    developers = read_developers()
+    inspirations = read_inspirations()
+    osg_snapshot.write(entries, developers, inspirations)
+    return entries, developers, inspirations
+
+
 def read_entry(file):
     """
     Reads a single entry
@@ -274,28 +434,34 @@ def read_entry(file):
     if not isinstance(file, pathlib.Path):
         file = c.entries_path / file
 
-    # setup parser and transformer
-    grammar_file = c.code_path / 'grammar_entries.lark'
-    grammar = utils.read_text(grammar_file)
-    parse = osg_parse.create(grammar, osg_parse.EntryTransformer)
-
     # read entry file
     content = utils.read_text(file)
-    if not content.endswith('\n'):
-        content += '\n'
 
-    # parse and transform entry content
-    try:
-        entry = parse(content)
-        entry = [('File', file),] + entry  # add file information to the beginning
-        entry = check_and_process_entry(entry)
-    except Exception as e:
+    # parse and transform entry content (the parser is shared process-wide)
+    entry, e = parse_entry(file, content)
+    if e:
         print(f'{file} - {e}')
         raise RuntimeError(e)
+    entry.mark_unmodified()
 
     return entry
 
 
+def intern_entry(entry):
+    """
+    Replaces the values of the vocabulary fields of an entry by the shared instances of the vocabulary of this process
+    (see osg_parse.intern_values). Must also be done for entries that were unpickled (from the cache or from another
+    process).
+    """
+    for field in c.vocabulary_fields:
+        if field in entry:
+            entry[field] = osg_parse.intern_values(entry[field])
+    building = entry['Building']
+    for field in c.vocabulary_building_fields:
+        if field in building:
+            building[field] = osg_parse.intern_values(building[field])
+
+
 def check_and_process_entry(entry):
     """
 
@@ -313,13 +479,13 @@ def check_and_process_entry(entry):
         if index == len(c.valid_fields):  # must be valid fields and must be in the right order
             message += f'Field "{field}" either misspelled or in wrong order\n'
 
-    # order is fine we can convert now to dictionary
+    # order is fine we can convert now to a compact record (behaving like a dictionary)
     d = {}
     for field, value in entry:
         if field in d:
             message += f'Field "{field}" appears twice\n'
         d[field] = value
-    entry = d
+    entry = osg_parse.Entry(d)
 
     # check for essential fields
     for field in c.essential_fields:
@@ -333,14 +499,16 @@ def check_and_process_entry(entry):
         if field in d:
             message += f'Field "{field}" appears twice\n'
         d[field] = value
-    building = d
+    building = osg_parse.Building(d)
 
     # check valid fields in building TODO should also check order
-    for field in building.keys():
+    for field in d.keys():
         if field not in c.valid_building_fields:
             message += f'Building field "{field}" invalid\n'
     entry['Building'] = building
 
+    intern_entry(entry)
+
     # check canonical file name
     file = entry['File']
     canonical_filename = canonical_name(entry['Title']) + '.md'
@@ -436,22 +604,56 @@ def extract_inactive_year(entry):
         return None
 
 
+def index_entries(entries):
+    """
+    Builds an inverted index over the entries for fast queries (see osg_index).
+    """
+    return osg_index.EntryIndex(entries)
+
+
+def any_of(field, values):
+    """
+    Query for entries having any of the values in a field (see osg_index).
+    """
+    return ('or',) + tuple((field, value) for value in values)
+
+
+def inactive_query(index):
+    """
+    Query for inactive entries (the state "inactive since <year>" is a different value for every year).
+    """
+    phrase = 'inactive since '
+    return any_of('State', [x for x in index.values('State') if x.startswith(phrase)])
+
+
 def write_entries(entries):
     """
+    Writes the entries that were modified since they were read (see osg_parse.Record.is_modified). Modified entries
+    are rendered, but only written if the content differs from the file.
 
-    :return:
+    :return: Number of rendered, skipped (unmodified) and written entries
     """
+    rendered, skipped, written = 0, 0, 0
 
     # iterate over all entries
     for entry in entries:
-        write_entry(entry)
+        if isinstance(entry, osg_parse.Record) and not entry.is_modified():
+            skipped += 1
+            continue
+        rendered += 1
+        if write_entry(entry):
+            written += 1
+
+    print(f'{rendered} entries rendered, {skipped} skipped (unmodified), {written} written')
+    return rendered, skipped, written
 
 
 def write_entry(entry, overwrite=True):
     """
+    Renders an entry and writes it (atomically) if the content differs from the file.
 
     :param entry:
-    :return:
+    :return: True if the file was written
     """
     # TODO check entry
 
@@ -464,7 +666,10 @@ def write_entry(entry, overwrite=True):
     content = create_entry_content(entry)
 
     # write entry
-    utils.write_text(entry_path, content)
+    written = utils.write_text_if_changed(entry_path, content)
+    if isinstance(entry, osg_parse.Record):
+        entry.mark_unmodified()
+    return written
 
 
 def render_value(value):
@@ -0,0 +1,63 @@
+"""
+On-disk cache of parsed and processed entries. Every cached entry is keyed by the hash of its file content and the
+whole cache is keyed by a version (hash of the grammar, the constants and the parsing code), so that only changed
+entry files need to be parsed again.
+"""
+
+import hashlib
+import os
+import pickle
+
+from utils import constants as c
+
+# any change in these files invalidates the whole cache
+version_files = (c.entries_grammar_file, c.code_path / 'utils' / 'constants.py',
+                 c.code_path / 'utils' / 'osg_parse.py', c.code_path / 'utils' / 'osg.py')
+
+
+def content_hash(content):
+    """
+    Hash of the text content of an entry file.
+    """
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def version():
+    """
+    Hash of all files that influence the outcome of parsing and processing an entry.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for file in version_files:
+        h.update(file.read_bytes())
+    return h.hexdigest()
+
+
+def load_entries():
+    """
+    Loads the cached entries.
+
+    :return: A dictionary file name -> (content hash, entry), empty if there is no valid cache.
+    """
+    try:
+        with open(c.entries_cache_file, 'rb') as f:
+            cache_version, entries = pickle.load(f)
+    except Exception:  # missing, outdated or corrupted cache files are not an error, they are just rebuilt
+        return {}
+    if cache_version != version():
+        return {}
+    return entries
+
+
+def save_entries(entries):
+    """
+    Stores the entries in the cache.
+
+    :param entries: A dictionary file name -> (content hash, entry)
+    """
+    c.cache_path.mkdir(parents=True, exist_ok=True)
+    # written to a temporary file which is then renamed, so that other tools never read a half written cache
+    file = c.entries_cache_file
+    temporary_file = file.with_name(f'.{file.name}.{os.getpid()}.tmp')
+    with open(temporary_file, 'wb') as f:
+        pickle.dump((version(), entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary_file, file)
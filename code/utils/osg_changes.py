@@ -0,0 +1,217 @@
+"""
+Change sets: which source files of the database (entries, developers.md, inspirations.md, screenshots) changed since a
+tool processed them the last time, as told by git. Every tool records the state of the working tree it processed last
+(in the cache folder): the commit and the content hashes of the source files that differed from it (uncommitted or
+untracked, None if deleted). The change set consists of the differences between that commit and the working tree
+(staged or not) and of all untracked files, without the files that still have their recorded content, plus the
+recorded files whose content changed since (for example an uncommitted change that was reverted).
+
+Changes of the code itself (everything in the code folder) mean that everything must be processed again, as do
+missing records or a missing git.
+
+    changes = osg_changes.change_set('statistics')
+    if changes:
+        ...  # process changes.entries or everything if changes.complete
+        osg_changes.mark_processed('statistics')
+"""
+
+import hashlib
+import json
+import subprocess
+
+from utils import utils, constants as c
+
+# paths relative to the root (as used by git)
+entries_folder = c.entries_path.relative_to(c.root_path).as_posix() + '/'
+screenshots_folder = c.screenshots_path.relative_to(c.root_path).as_posix() + '/'
+code_folder = c.code_path.relative_to(c.root_path).as_posix() + '/'
+cache_folder = c.cache_path.relative_to(c.root_path).as_posix() + '/'
+
+# the state of the working tree when the change set of a tool was determined (see change_set and mark_processed)
+states = {}
+
+
+def git(*arguments):
+    """
+    Runs a git command in the root folder.
+
+    :return: Lines of the output or None if git failed (or is not available)
+    """
+    try:
+        result = subprocess.run(('git', '-c', 'core.quotepath=off') + arguments, cwd=c.root_path, capture_output=True,
+                                text=True, encoding='utf-8')
+    except OSError:
+        return None
+    if result.returncode:
+        return None
+    return [line for line in result.stdout.split('\n') if line]
+
+
+def head():
+    """
+    The current commit or None.
+    """
+    lines = git('rev-parse', '--verify', '--quiet', 'HEAD')
+    return lines[0] if lines else None
+
+
+class ChangeSet:
+    """
+    Changed files (relative to the root) sorted into entries (file names of added, modified or deleted entries),
+    developers, inspirations and screenshots. complete means that everything must be considered changed.
+    """
+
+    def __init__(self, files=(), complete=False):
+        self.files = sorted(files)
+        self.complete = complete
+        self.entries = set()
+        self.developers = self.inspirations = self.screenshots = False
+        for file in self.files:
+            if file == c.developer_file.name:
+                self.developers = True
+            elif file == c.inspirations_file.name:
+                self.inspirations = True
+            elif file.startswith(screenshots_folder):
+                self.screenshots = True
+            elif file.startswith(entries_folder):
+                name = file[len(entries_folder):]
+                if '/' not in name and name.endswith('.md'):
+                    self.entries.add(name)
+            elif file.startswith(code_folder) and not file.startswith(cache_folder):
+                self.complete = True
+
+    def __bool__(self):
+        return bool(self.complete or self.entries or self.developers or self.inspirations or self.screenshots)
+
+    def entry_files(self):
+        """
+        Changed entry files that still exist (deleted ones are only in entries).
+        """
+        return [c.entries_path / name for name in sorted(self.entries) if (c.entries_path / name).is_file()]
+
+    def __str__(self):
+        if self.complete:
+            return 'everything changed'
+        parts = [f'{len(self.entries)} entries'] if self.entries else []
+        parts.extend(name for name in ('developers', 'inspirations', 'screenshots') if getattr(self, name))
+        return ', '.join(parts) + ' changed' if parts else 'nothing changed'
+
+
+def changed_files(since):
+    """
+    Files that differ between a commit and the working tree plus untracked files.
+
+    :return: List of files (relative to the root) or None if git cannot tell
+    """
+    changed = git('diff', '--name-only', '--no-renames', since, '--')
+    untracked = git('ls-files', '--others', '--exclude-standard')
+    if changed is None or untracked is None:
+        return None
+    return changed + untracked
+
+
+def is_source(file):
+    """
+    True if a file (relative to the root) is a source file for a change set (see ChangeSet).
+    """
+    if file in (c.developer_file.name, c.inspirations_file.name):
+        return True
+    return file.startswith((entries_folder, screenshots_folder, code_folder)) and not file.startswith(cache_folder)
+
+
+def file_hash(file):
+    """
+    Hash of the content of a file (relative to the root) or None if it does not exist.
+    """
+    path = c.root_path / file
+    if not path.is_file():
+        return None
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+def working_tree_state():
+    """
+    The current commit and the content hashes of the source files that differ from it (see is_source).
+
+    :return: {'commit': commit, 'files': {file: hash or None if deleted}} or None if git cannot tell
+    """
+    commit = head()
+    files = changed_files(commit) if commit else None
+    if files is None:
+        return None
+    return {'commit': commit, 'files': {file: file_hash(file) for file in files if is_source(file)}}
+
+
+def staged():
+    """
+    Change set of the files staged for the next commit (for example in a pre-commit hook).
+    """
+    files = git('diff', '--cached', '--name-only', '--no-renames')
+    if files is None:
+        return ChangeSet(complete=True)
+    return ChangeSet(files)
+
+
+def unstaged():
+    """
+    Files whose content in the working tree differs from the content staged for the next commit (unstaged changes and
+    untracked files). All other files can be read from the working tree instead of from the git index.
+
+    :return: Set of files (relative to the root) or None if git cannot tell
+    """
+    changed = git('diff', '--name-only', '--no-renames')
+    untracked = git('ls-files', '--others', '--exclude-standard')
+    if changed is None or untracked is None:
+        return None
+    return set(changed) | set(untracked)
+
+
+def staged_text(file):
+    """
+    Content of a file (relative to the root) as staged for the next commit or None if it is not in the git index.
+    """
+    try:
+        result = subprocess.run(('git', 'show', f':{file}'), cwd=c.root_path, capture_output=True)
+    except OSError:
+        return None
+    if result.returncode:
+        return None
+    return result.stdout.decode('utf-8', errors='ignore')
+
+
+def read_processed():
+    if not c.processed_commits_file.is_file():
+        return {}
+    try:
+        return json.loads(utils.read_text(c.processed_commits_file))
+    except ValueError:
+        return {}
+
+
+def change_set(tool):
+    """
+    Change set since the last call of mark_processed for a tool (complete if there was none).
+    """
+    states[tool] = working_tree_state()
+    record = read_processed().get(tool)
+    if isinstance(record, str):  # older records only have the commit
+        record = {'commit': record, 'files': {}}
+    files = changed_files(record['commit']) if record else None
+    if files is None:
+        return ChangeSet(complete=True)
+    recorded = record['files']
+    return ChangeSet(file for file in set(files) | recorded.keys() if file not in recorded or file_hash(file) != recorded[file])
+
+
+def mark_processed(tool):
+    """
+    Records the state of the working tree as processed by a tool, as it was when its change set was determined (so
+    changes made in the meantime are in the next change set) or else as it is now.
+    """
+    state = states.pop(tool, None) or working_tree_state()
+    if not state:
+        return
+    processed = read_processed()
+    processed[tool] = state
+    c.cache_path.mkdir(parents=True, exist_ok=True)
+    utils.write_text(c.processed_commits_file, json.dumps(processed, indent=1, sort_keys=True))
@@ -0,0 +1,220 @@
+"""
+SQLite database with the entries, developers, inspirations and screenshot infos, for ad-hoc queries and (fuzzy) lookups
+without parsing everything again. It is a derived, local artifact (in the cache folder) and is updated incrementally:
+every source file is stored together with the hash of its content and only changed files are read again. It is rebuilt
+if the schema or the parsing code (osg_cache.version) changes.
+
+Tables:
+    code_version (value)                                  osg_cache.version of the code that filled the database
+    files (name, hash)                                    source files (relative to the root) and their content hashes
+    entries (id, file, title, note, building_note)        one row per entry
+    entry_values (entry_id, field, position, value, comment)  all multi-valued fields of the entries (also building)
+    listings (id, kind, name)                             developers and inspirations (kind 'developer'/'inspiration')
+    listing_values (listing_id, field, position, value)   their fields
+    screenshots (name, number, width, height, url)        from entries/screenshots/README.md
+    entries_search                                        FTS5 index over title, note and keywords of the entries
+"""
+
+import re
+import sqlite3
+from difflib import SequenceMatcher
+
+from utils import osg, osg_cache, osg_parse, utils, constants as c
+
+schema = """
+CREATE TABLE IF NOT EXISTS code_version (value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (name TEXT PRIMARY KEY, hash TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, file TEXT NOT NULL UNIQUE, title TEXT NOT NULL, note TEXT,
+    building_note TEXT);
+CREATE INDEX IF NOT EXISTS entries_title ON entries (title);
+CREATE TABLE IF NOT EXISTS entry_values (entry_id INTEGER NOT NULL REFERENCES entries (id) ON DELETE CASCADE,
+    field TEXT NOT NULL, position INTEGER NOT NULL, value TEXT NOT NULL, comment TEXT);
+CREATE INDEX IF NOT EXISTS entry_values_entry ON entry_values (entry_id);
+CREATE INDEX IF NOT EXISTS entry_values_field_value ON entry_values (field, value);
+CREATE TABLE IF NOT EXISTS listings (id INTEGER PRIMARY KEY, kind TEXT NOT NULL, name TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS listings_kind_name ON listings (kind, name);
+CREATE TABLE IF NOT EXISTS listing_values (listing_id INTEGER NOT NULL REFERENCES listings (id) ON DELETE CASCADE,
+    field TEXT NOT NULL, position INTEGER NOT NULL, value TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS listing_values_listing ON listing_values (listing_id);
+CREATE INDEX IF NOT EXISTS listing_values_field_value ON listing_values (field, value);
+CREATE TABLE IF NOT EXISTS screenshots (name TEXT NOT NULL, number INTEGER NOT NULL, width INTEGER, height INTEGER,
+    url TEXT, PRIMARY KEY (name, number));
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_search USING fts5 (title, note, keywords);
+"""
+
+# increase if the schema or the stored content changes (the database is then rebuilt)
+schema_version = 2
+
+# the listing files and their kinds
+listing_files = {'developer': c.developer_file, 'inspiration': c.inspirations_file}
+
+# additions in parentheses in titles (ignored by the fuzzy lookup)
+regex_title_addition = re.compile(r' \([^)]*\)')
+
+
+def connect(file=c.database_file):
+    """
+    Opens the database (creating it if needed).
+    """
+    c.cache_path.mkdir(parents=True, exist_ok=True)
+    code_version = osg_cache.version()
+    connection = sqlite3.connect(file)
+    connection.execute('PRAGMA foreign_keys = ON')
+    if connection.execute('PRAGMA user_version').fetchone()[0] != schema_version or stored_code_version(connection) != code_version:
+        connection.close()
+        file.unlink()
+        connection = sqlite3.connect(file)
+        connection.execute('PRAGMA foreign_keys = ON')
+        connection.execute(f'PRAGMA user_version = {schema_version}')
+        connection.executescript(schema)
+        connection.execute('INSERT INTO code_version VALUES (?)', (code_version,))
+        connection.commit()
+    return connection
+
+
+def stored_code_version(connection):
+    """
+    The code version (osg_cache.version) of the content or None.
+    """
+    try:
+        row = connection.execute('SELECT value FROM code_version').fetchone()
+    except sqlite3.OperationalError:  # no such table
+        return None
+    return row[0] if row else None
+
+
+def insert_entry(connection, name, entry):
+    """
+    Inserts an entry (replacing an existing entry from the same file).
+    """
+    delete_entry(connection, name)
+    building = entry['Building']
+    cursor = connection.execute('INSERT INTO entries (file, title, note, building_note) VALUES (?, ?, ?, ?)',
+                                (name, entry['Title'], entry.get('Note'), building.get('Note')))
+    entry_id = cursor.lastrowid
+    rows = []
+    for record in (entry, building):
+        for field, values in record.items():
+            if isinstance(values, list):
+                for position, value in enumerate(values):
+                    comment = value.comment if isinstance(value, osg_parse.Value) else None
+                    rows.append((entry_id, field, position, str(value), comment))
+    connection.executemany('INSERT INTO entry_values VALUES (?, ?, ?, ?, ?)', rows)
+    connection.execute('INSERT INTO entries_search (rowid, title, note, keywords) VALUES (?, ?, ?, ?)',
+                       (entry_id, entry['Title'], entry.get('Note', ''), ', '.join(entry['Keyword'])))
+
+
+def delete_entry(connection, name):
+    """
+    Deletes the entry from a file (if existing).
+    """
+    row = connection.execute('SELECT id FROM entries WHERE file = ?', (name,)).fetchone()
+    if row:
+        connection.execute('DELETE FROM entries_search WHERE rowid = ?', row)
+        connection.execute('DELETE FROM entries WHERE id = ?', row)
+
+
+def insert_listing(connection, kind, listing):
+    """
+    Replaces all developers or inspirations.
+    """
+    connection.execute('DELETE FROM listings WHERE kind = ?', (kind,))
+    rows = []
+    for name, item in listing.items():
+        listing_id = connection.execute('INSERT INTO listings (kind, name) VALUES (?, ?)', (kind, name)).lastrowid
+        for field, values in item.items():
+            if field == 'Name':
+                continue
+            if not isinstance(values, list):
+                values = [values]
+            rows.extend((listing_id, field, position, str(value)) for position, value in enumerate(values))
+    connection.executemany('INSERT INTO listing_values VALUES (?, ?, ?, ?)', rows)
+
+
+def insert_screenshots(connection, overview):
+    """
+    Replaces all screenshot infos.
+    """
+    connection.execute('DELETE FROM screenshots')
+    rows = [(name, number, width, height, url) for name, screenshots in overview.items()
+            for number, (width, height, url) in screenshots.items()]
+    connection.executemany('INSERT INTO screenshots VALUES (?, ?, ?, ?, ?)', rows)
+
+
+def update(connection):
+    """
+    Brings the database up to date with the files. Only changed files are read again.
+
+    :return: Number of updated and deleted files
+    """
+    stored = dict(connection.execute('SELECT name, hash FROM files'))
+    updated, deleted = 0, 0
+    with connection:
+        # entries
+        entry_files = set()
+        for file, name, content in osg.entry_iterator():
+            key = f'{c.entries_path.name}/{name}'
+            entry_files.add(key)
+            content_hash = osg_cache.content_hash(content)
+            if stored.get(key) == content_hash:
+                continue
+            entry, e = osg.parse_entry(file, content)
+            if e:
+                print(f'{file} - {e}')  # the old content is removed and the file is tried again next time
+                delete_entry(connection, name)
+                connection.execute('DELETE FROM files WHERE name = ?', (key,))
+                continue
+            insert_entry(connection, name, entry)
+            connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?)', (key, content_hash))
+            updated += 1
+        for key in stored.keys() - entry_files:
+            directory, _, name = key.partition('/')
+            if directory == c.entries_path.name and '/' not in name:
+                delete_entry(connection, name)
+                connection.execute('DELETE FROM files WHERE name = ?', (key,))
+                deleted += 1
+
+        # developers and inspirations
+        for kind, file in listing_files.items():
+            content_hash = osg_cache.content_hash(utils.read_text(file))
+            if stored.get(file.name) == content_hash:
+                continue
+            listing = osg.read_developers() if kind == 'developer' else osg.read_inspirations()
+            insert_listing(connection, kind, listing)
+            connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?)', (file.name, content_hash))
+            updated += 1
+
+        # screenshots
+        name = c.screenshots_file.relative_to(c.root_path).as_posix()
+        content_hash = osg_cache.content_hash(utils.read_text(c.screenshots_file))
+        if stored.get(name) != content_hash:
+            insert_screenshots(connection, osg.read_screenshots_overview())
+            connection.execute('INSERT OR REPLACE INTO files VALUES (?, ?)', (name, content_hash))
+            updated += 1
+    return updated, deleted
+
+
+def search(connection, query):
+    """
+    Full text search (FTS5 query syntax) over titles, notes and keywords.
+
+    :return: List of (file, title) of matching entries, best match first
+    """
+    return connection.execute('SELECT e.file, e.title FROM entries_search s JOIN entries e ON e.id = s.rowid '
+                              'WHERE entries_search MATCH ? ORDER BY rank', (query,)).fetchall()
+
+
+def similar_titles(connection, name, threshold=0.7):
+    """
+    Fuzzy lookup of entry titles (ignoring case and anything in parentheses).
+
+    :return: List of (title, similarity) with similarity above the threshold, most similar first
+    """
+    name = name.casefold()
+    matches = []
+    for title, in connection.execute('SELECT title FROM entries'):
+        similarity = SequenceMatcher(None, name, regex_title_addition.sub('', title).casefold()).ratio()
+        if similarity > threshold:
+            matches.append((title, similarity))
+    matches.sort(key=lambda x: x[1], reverse=True)
+    return matches
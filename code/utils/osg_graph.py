@@ -0,0 +1,174 @@
+"""
+Cross-reference graph between entries, developers and inspirations. Entries reference developers and inspirations (in
+their "Developer" and "Inspiration" fields) and the developers and inspirations lists reference entries by title (in
+their "Games" and "Inspired entries" fields). The graph holds both directions in hash maps, so that all the
+consistency checks (orphans, missing links in both directions, duplicates) need only a single pass over the data.
+"""
+
+# the listings and their fields referencing entries, together with the field of the entries referencing them
+listing_fields = {
+    'developer': ('Games', 'Developer'),
+    'inspiration': ('Inspired entries', 'Inspiration')
+}
+
+
+def duplicates(names):
+    """
+    Names that appear more than once (each reported once, in order of their first repetition).
+    """
+    seen = set()
+    result = {}
+    for name in names:
+        if name in seen:
+            result[name] = True
+        else:
+            seen.add(name)
+    return list(result.keys())
+
+
+class CrossReferences:
+    """
+    Links entry titles, developer names and inspiration names in both directions.
+    """
+
+    def __init__(self, entries, developers=None, inspirations=None):
+        """
+        :param entries: List of entries
+        :param developers: Optional mapping name -> developer (as from osg.read_developers)
+        :param inspirations: Optional mapping name -> inspiration (as from osg.read_inspirations)
+        """
+        # title -> list of entries with that title (should be exactly one)
+        self.entries = {}
+        # kind -> name -> titles of the entries referencing this name (from the entries)
+        self.referenced_by_entries = {kind: {} for kind in listing_fields}
+        for entry in entries:
+            self.add_entry(entry)
+
+        self.listings = {}
+        # kind -> name -> titles listed in the listing (from the listings)
+        self.listed_entries = {}
+        # kind -> title -> names listing this title (from the listings)
+        self.listing_names = {}
+        self.set_listing('developer', developers or {})
+        self.set_listing('inspiration', inspirations or {})
+
+    def add_entry(self, entry):
+        """
+        Adds the links of an entry.
+        """
+        title = entry['Title']
+        self.entries.setdefault(title, []).append(entry)
+        for kind, (_, entry_field) in listing_fields.items():
+            referenced = self.referenced_by_entries[kind]
+            for name in entry.get(entry_field, []):
+                referenced.setdefault(name, []).append(title)
+
+    def remove_entry(self, entry):
+        """
+        Removes the links of an entry (which must have been added before and must not have changed since then).
+        """
+        title = entry['Title']
+        entries = self.entries[title]
+        entries.remove(next(x for x in entries if x is entry))
+        if not entries:
+            del self.entries[title]
+        for kind, (_, entry_field) in listing_fields.items():
+            referenced = self.referenced_by_entries[kind]
+            for name in entry.get(entry_field, []):
+                referenced[name].remove(title)
+                if not referenced[name]:
+                    del referenced[name]
+
+    def set_listing(self, kind, listing):
+        """
+        Sets (or replaces) the developers or inspirations.
+        """
+        listing_field, _ = listing_fields[kind]
+        self.listings[kind] = listing
+        self.listed_entries[kind] = {name: item[listing_field] for name, item in listing.items()}
+        listing_names = {}
+        for name, titles in self.listed_entries[kind].items():
+            for title in titles:
+                listing_names.setdefault(title, []).append(name)
+        self.listing_names[kind] = listing_names
+
+    def duplicate_titles(self):
+        """
+        Titles used by more than one entry.
+        """
+        return [title for title, entries in self.entries.items() if len(entries) > 1]
+
+    def orphans(self, kind):
+        """
+        Names of developers or inspirations without any listed entries.
+        """
+        return [name for name, titles in self.listed_entries[kind].items() if not titles]
+
+    def missing_links(self, kind):
+        """
+        Entries listed for a developer or inspiration that either do not exist or do not list that developer or
+        inspiration themselves.
+
+        :return: List of tuples (name, entry title, problem) with problem being 'missing entry', 'ambiguous entry' or
+        'not listed in entry'
+        """
+        _, entry_field = listing_fields[kind]
+        problems = []
+        for name, titles in self.listed_entries[kind].items():
+            for title in titles:
+                entries = self.entries.get(title, [])
+                if not entries:
+                    problems.append((name, title, 'missing entry'))
+                elif len(entries) > 1:
+                    problems.append((name, title, 'ambiguous entry'))
+                elif name not in entries[0].get(entry_field, []):
+                    problems.append((name, title, 'not listed in entry'))
+        return problems
+
+    def unlisted_references(self, kind):
+        """
+        References from entries to developers or inspirations that are not in the listing or that do not list the entry.
+
+        :return: List of tuples (name, entry title)
+        """
+        listing = self.listed_entries[kind]
+        problems = []
+        for name, titles in self.referenced_by_entries[kind].items():
+            listed = set(listing.get(name, []))
+            problems.extend((name, title) for title in titles if title not in listed)
+        return problems
+
+    def entry_problems(self, title):
+        """
+        All problems with the links of the entries with a given title (also if there is no such entry anymore). Only
+        looks at the links of this title, i.e. takes time proportional to the number of its links.
+
+        :return: List of tuples (kind, name, problem) with problem being 'missing entry', 'ambiguous entry',
+        'not listed in entry', 'not in listing' or 'entry not listed'
+        """
+        entries = self.entries.get(title, [])
+        problems = []
+        for kind, (_, entry_field) in listing_fields.items():
+            # listings that list this title
+            for name in self.listing_names[kind].get(title, []):
+                if not entries:
+                    problems.append((kind, name, 'missing entry'))
+                elif len(entries) > 1:
+                    problems.append((kind, name, 'ambiguous entry'))
+                elif name not in entries[0].get(entry_field, []):
+                    problems.append((kind, name, 'not listed in entry'))
+            # names that the entries reference
+            listing = self.listed_entries[kind]
+            for entry in entries:
+                for name in entry.get(entry_field, []):
+                    if name not in listing:
+                        problems.append((kind, name, 'not in listing'))
+                    elif title not in listing[name]:
+                        problems.append((kind, name, 'entry not listed'))
+        return problems
+
+    def is_entry(self, title):
+        """
+        True if there is an entry with this title.
+        """
+        return title in self.entries
@@ -0,0 +1,106 @@
+"""
+Inverted indexes over the entries. For every indexed field, a mapping value -> positions of the entries having that
+value, so that questions like "entries with keyword X" or "entries on platform Y" do not need a scan over all entries.
+
+Queries are nested tuples:
+    (field, value)          entries having value in field
+    ('and', query, ...)     entries matching all queries
+    ('or', query, ...)      entries matching any query
+    ('not', query)          entries not matching the query
+
+Results are always in the order of the indexed entries.
+"""
+
+from utils import constants as c
+
+
+class EntryIndex:
+    """
+    Inverted index of a list of entries (built once, does not follow later changes of the entries).
+    """
+
+    # indexed fields
+    fields = ('Keyword', 'Platform', 'Code language', 'Code license', 'Code dependency', 'Developer', 'Inspiration',
+              'State', 'Build system')
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.postings = {field: {} for field in self.fields}  # field -> value -> list of positions (ascending)
+        for position, entry in enumerate(entries):
+            for field in self.fields:
+                record = entry['Building'] if field in c.valid_building_fields else entry
+                postings = self.postings[field]
+                for value in record.get(field, ()):
+                    positions = postings.setdefault(value, [])
+                    if not positions or positions[-1] != position:  # value twice in the same entry
+                        positions.append(position)
+
+    def values(self, field):
+        """
+        All values of a field (in order of first occurrence).
+        """
+        return list(self.postings[field].keys())
+
+    def counts(self, field):
+        """
+        Number of entries for every value of a field.
+        """
+        return {value: len(positions) for value, positions in self.postings[field].items()}
+
+    def positions(self, query):
+        """
+        Set of positions of the entries matching the query.
+        """
+        operator = query[0]
+        if operator == 'and':
+            result = self.positions(query[1])
+            for subquery in query[2:]:
+                result &= self.positions(subquery)
+            return result
+        if operator == 'or':
+            result = set()
+            for subquery in query[1:]:
+                result |= self.positions(subquery)
+            return result
+        if operator == 'not':
+            return set(range(len(self.entries))) - self.positions(query[1])
+        field, value = query
+        if field not in self.postings:
+            raise RuntimeError(f'Field "{field}" is not indexed')
+        return set(self.postings[field].get(value, ()))
+
+    def select(self, query):
+        """
+        Entries matching the query.
+        """
+        # single terms are already sorted
+        if query[0] not in ('and', 'or', 'not'):
+            self.positions(query)  # checks the field
+            return [self.entries[position] for position in self.postings[query[0]].get(query[1], ())]
+        return [self.entries[position] for position in sorted(self.positions(query))]
+
+    def count(self, query):
+        """
+        Number of entries matching the query.
+        """
+        return len(self.positions(query))
+
+    def categorize(self, field, categories, unknown_category_name=None, value=None):
+        """
+        Sorts the entries into categories by the values of a field, an entry can be in several categories. Takes time
+        proportional to the number of postings of the categories (and not entries x categories).
+
+        :param value: Optional function from category to field value (default is the category itself)
+        :param unknown_category_name: If given, entries that fit in no category are collected under this name
+        :return: A mapping category (or unknown_category_name) -> list of entries in that category
+        """
+        postings = self.postings[field]
+        categorized = {}
+        categorized_positions = set()
+        for category in categories:
+            positions = postings.get(value(category) if value else category, [])
+            categorized[category] = [self.entries[position] for position in positions]
+            categorized_positions.update(positions)
+        if unknown_category_name:
+            categorized[unknown_category_name] = [entry for position, entry in enumerate(self.entries) if position not in categorized_positions]
+        return categorized
@@ -0,0 +1,121 @@
+"""
+Small index of all names in the database (entry titles by file name and the names of the developers and of the
+inspirations) for quick lookups without parsing anything, for example in a pre-commit hook. It is kept in the cache
+folder and only files whose size or modification time changed are read again, and then only their titles (first
+line) or their headings ("## name [n]").
+"""
+
+import json
+import os
+import re
+
+from utils import utils, constants as c
+
+# increase if the stored content changes
+index_version = 1
+
+# a developer or inspiration heading "## name [number]" (as in grammar_listing.lark)
+regex_listing_name = re.compile(r'^## (?! )(.+?) +\[[0-9]+\] *$', re.MULTILINE)
+
+# the listing files by kind
+listing_files = {'developer': c.developer_file, 'inspiration': c.inspirations_file}
+
+
+def stamp(stat):
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def read_title(file):
+    """
+    Title of an entry from its first line ("# title") or None.
+    """
+    with open(file, encoding='utf-8') as f:
+        return title_of(f.readline())
+
+
+def title_of(line):
+    return line[2:].strip() if line.startswith('# ') else None
+
+
+def listing_names(file):
+    """
+    Names of all developers or inspirations in a listing file (in order).
+    """
+    return regex_listing_name.findall(utils.read_text(file))
+
+
+class NameIndex:
+    """
+    Entry titles (titles: file name -> title) and developer and inspiration names (names: kind -> set of names), up to
+    date with the files once created.
+    """
+
+    def __init__(self, file=c.names_file):
+        self.file = file
+        data = {}
+        if file.is_file():
+            try:
+                data = json.loads(utils.read_text(file))
+            except ValueError:
+                pass
+        if data.get('version') != index_version:
+            data = {'version': index_version, 'entries': {}, 'listings': {}}
+        self.changed = False
+
+        # entries
+        stored = data['entries']
+        entries = {}
+        for entry in os.scandir(c.entries_path):
+            if entry.is_file() and entry.name.endswith('.md'):
+                file_stamp = stamp(entry.stat())
+                item = stored.get(entry.name)
+                if not item or item[0] != file_stamp:
+                    item = [file_stamp, read_title(entry.path)]
+                    self.changed = True
+                entries[entry.name] = item
+        self.changed |= entries.keys() != stored.keys()
+        data['entries'] = entries
+
+        # developers and inspirations
+        for kind, listing_file in listing_files.items():
+            file_stamp = stamp(listing_file.stat())
+            item = data['listings'].get(kind)
+            if not item or item[0] != file_stamp:
+                data['listings'][kind] = [file_stamp, listing_names(listing_file)]
+                self.changed = True
+
+        self.data = data
+        self.titles = {name: item[1] for name, item in entries.items()}
+        self.names = {kind: set(item[1]) for kind, item in data['listings'].items()}
+        if self.changed:
+            self.save()
+
+    def save(self):
+        c.cache_path.mkdir(parents=True, exist_ok=True)
+        utils.write_text(self.file, json.dumps(self.data, ensure_ascii=False, separators=(',', ':')))
+
+    def use_staged(self, files, read):
+        """
+        Takes the titles and names of some files (relative to the root) from another content, for example the content
+        staged for the next commit (osg_changes.unstaged and osg_changes.staged_text). Not saved.
+
+        :param read: Function giving the content of a file or None if it does not exist
+        """
+        entries_folder = c.entries_path.relative_to(c.root_path).as_posix() + '/'
+        for file in files:
+            kind = next((kind for kind, x in listing_files.items() if x.relative_to(c.root_path).as_posix() == file), None)
+            if kind:
+                self.names[kind] = set(regex_listing_name.findall(read(file) or ''))
+            elif file.startswith(entries_folder) and file.endswith('.md') and '/' not in file[len(entries_folder):]:
+                name = file[len(entries_folder):]
+                text = read(file)
+                if text is None:
+                    self.titles.pop(name, None)
+                else:
+                    self.titles[name] = title_of(text.split('\n', 1)[0])
+
+    def files_with_title(self, title):
+        """
+        Names of the entry files with a given title.
+        """
+        return [name for name, other in self.titles.items() if other == title]
@@ -6,6 +6,9 @@ from functools import partial
 import lark
 from utils import utils, constants as c
 
+# parse functions set up so far in this process (by grammar file and transformer)
+parsers = {}
+
 
 class ListingTransformer(lark.Transformer):
     """
@@ -158,6 +161,7 @@ class Value(str):
     """
     A value is a string with an additional meta-object (a comment) but mostly behaves like a string.
     """
+    __slots__ = ('comment',)
 
     def __new__(cls, value, comment=None):
         obj = str.__new__(cls, value)
@@ -165,18 +169,429 @@ class Value(str):
         return obj
 
 
+# shared vocabulary (value -> shared instance of the value), pre-filled with the known values from the constants, so that
+# interned values are the very same objects as the constants (membership tests and comparisons mostly succeed by
+# identity then)
+vocabulary = {}
+
+
+def intern_value(value):
+    """
+    Returns the shared instance of a value. Values with a comment are not shared (the comment is individual).
+    """
+    if isinstance(value, Value):
+        return value
+    return vocabulary.setdefault(value, value)
+
+
+def intern_values(values):
+    """
+    Interns a list of values.
+    """
+    return [intern_value(value) for value in values]
+
+
+for values in (c.valid_platforms, c.known_languages, c.known_licenses, c.interesting_keywords):
+    for value in values:
+        intern_value(value)
+
+
+class Record:
+    """
+    Compact record with a fixed set of known fields that behaves like a dictionary. The values of the known fields
+    are stored in a tuple (None meaning not existing) at the positions given by the class, other keys (for example
+    added by the static website generator) are stored in an additional dictionary that only exists if needed.
+
+    Iteration order is the order of the known fields followed by the other keys in insertion order.
+
+    Records also track whether they were modified since mark_unmodified was called (see is_modified).
+    """
+    __slots__ = ('_values', '_extra', '_state')
+
+    # known fields and their positions (set by subclasses)
+    fields = ()
+    positions = {}
+
+    def __init__(self, items=()):
+        values = [None] * len(self.fields)
+        extra = None
+        if hasattr(items, 'items'):
+            items = items.items()
+        for key, value in items:
+            position = self.positions.get(key)
+            if position is not None:
+                values[position] = value
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        self._values = tuple(values)
+        self._extra = extra
+        self._state = None
+
+    def __getitem__(self, key):
+        position = self.positions.get(key)
+        if position is not None:
+            value = self._values[position]
+            if value is not None:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        position = self.positions.get(key)
+        if position is not None:
+            values = self._values
+            self._values = values[:position] + (value,) + values[position + 1:]
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        position = self.positions.get(key)
+        if position is not None:
+            values = self._values
+            self._values = values[:position] + (None,) + values[position + 1:]
+        else:
+            del self._extra[key]
+
+    def __contains__(self, key):
+        position = self.positions.get(key)
+        if position is not None:
+            return self._values[position] is not None
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for field, value in zip(self.fields, self._values):
+            if value is not None:
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return len(self._values) - self._values.count(None) + (len(self._extra) if self._extra is not None else 0)
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self.items())!r})'
+
+    def get(self, key, default=None):
+        position = self.positions.get(key)
+        if position is not None:
+            value = self._values[position]
+            return default if value is None else value
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def pop(self, key, *default):
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, items=(), **kwargs):
+        if hasattr(items, 'items'):
+            items = items.items()
+        for key, value in list(items) + list(kwargs.items()):
+            self[key] = value
+
+    def copy(self):
+        return type(self)(self.items())
+
+    def state(self):
+        """
+        Contents of the known fields: the values with their comments (also of the items of list values) and nested
+        records as their state. Only references to the (immutable) strings are kept, so it is cheap to keep around.
+        """
+        state = []
+        for value in self._values:
+            if isinstance(value, list):
+                state.append(tuple((x, getattr(x, 'comment', None)) for x in value))
+            elif isinstance(value, Record):
+                state.append(value.state())
+            else:
+                state.append((value, getattr(value, 'comment', None)))
+        return tuple(state)
+
+    def mark_unmodified(self):
+        """
+        Remembers the current state (for example after reading or writing the record).
+        """
+        self._state = self.state()
+
+    def is_modified(self):
+        """
+        True if the record (without the other keys) was changed since mark_unmodified was called, by assignment, by
+        changing a list or a nested record in place or by changing the comment of a value.
+        """
+        return self._state is None or self._state != self.state()
+
+
+class Building(Record):
+    """
+    The building section of an entry.
+    """
+    __slots__ = ()
+    fields = c.valid_building_fields
+    positions = {field: position for position, field in enumerate(fields)}
+
+
+class Entry(Record):
+    """
+    An entry (file, title, properties, note and building section).
+    """
+    __slots__ = ()
+    fields = c.valid_fields
+    positions = {field: position for position, field in enumerate(fields)}
+
+
+def fast_parse_values(text):
+    """
+    Splits the values part of a property line (everything after the colon) into values like the value rules of
+    grammar_entries.lark together with EntryTransformer would do.
+
+    :return: List of values or None if the text is not in the usual format.
+    """
+    values = []
+    n = len(text)
+    i = 0
+    while True:
+        # skip whitespaces
+        while i < n and text[i] == ' ':
+            i += 1
+        if i == n or text[i] == ',':  # empty value
+            return None
+
+        if text[i] == '"':
+            # quoted value until next quotation mark
+            j = text.find('"', i + 1)
+            if j < 0:
+                return None
+            value = text[i + 1:j].strip()
+            i = j + 1
+        else:
+            # unquoted value until next comma or " (" (at least one character)
+            j = n
+            for stop in (text.find(',', i + 1), text.find(' (', i + 1)):
+                if 0 <= stop < j:
+                    j = stop
+            value = text[i:j].strip()
+            i = j
+        while i < n and text[i] == ' ':
+            i += 1
+
+        # optional comment in parenthesis (must be preceded by a space)
+        if i < n and text[i] == '(':
+            if text[i - 1] != ' ':
+                return None
+            j = text.find(')', i + 2)
+            if j < 0:
+                return None
+            value = Value(value, text[i + 1:j].strip())
+            i = j + 1
+            while i < n and text[i] == ' ':
+                i += 1
+
+        values.append(value)
+
+        # end of line or comma
+        if i == n:
+            return values
+        if text[i] != ',':
+            return None
+        i += 1
+
+
+def fast_parse_property(line):
+    """
+    Parses a property line "- key: values".
+
+    :return: Tuple (key, values) or None if the line is not in the usual format.
+    """
+    key, separator, text = line[1:].lstrip(' ').partition(':')
+    if not separator or not key or key[-1] == ' ':
+        return None
+    values = fast_parse_values(text)
+    if values is None:
+        return None
+    return key.strip(), values
+
+
+def fast_parse_entry(content):
+    """
+    Specialized single-pass reader for entries. Gives exactly the same result as parsing with grammar_entries.lark and
+    transforming with EntryTransformer, but is much faster. For anything unusual it gives up and returns None and the
+    content should be parsed with the grammar instead (which also gives the proper error messages).
+
+    :param content: Content of an entry file (must end on a new line)
+    :return: List of (key, value) tuples (as EntryTransformer) or None
+    """
+    if not content.endswith('\n') or '\t' in content or '\r' in content:
+        return None
+    lines = content[:-1].split('\n')
+    number_lines = len(lines)
+
+    # title line and empty line
+    if number_lines < 4 or not lines[0].startswith('# ') or lines[1]:
+        return None
+    title = lines[0][2:]
+    if not title or title[0] == ' ' or title[-1] == ' ':
+        return None
+    entry = [('Title', title.strip())]
+
+    # properties (at least one) and empty line
+    i = 2
+    while i < number_lines and lines[i].startswith('-'):
+        property = fast_parse_property(lines[i])
+        if not property:
+            return None
+        entry.append(property)
+        i += 1
+    if i == 2 or i == number_lines or lines[i]:
+        return None
+    i += 1
+
+    # optional note until the building section
+    start = i
+    while i < number_lines and lines[i] != '## Building':
+        if lines[i].startswith(('-', '#', ' ')):
+            return None
+        i += 1
+    if i == number_lines:
+        return None
+    note = '\n'.join(lines[start:i]).strip()
+    if note:
+        entry.append(('Note', note))
+    i += 1
+
+    # building section, starting with an empty line (if not empty)
+    building = []
+    if i < number_lines:
+        if lines[i]:
+            return None
+        i += 1
+
+        # optional building properties followed by an empty line
+        if i < number_lines and lines[i].startswith('-'):
+            while i < number_lines and lines[i].startswith('-'):
+                property = fast_parse_property(lines[i])
+                if not property:
+                    return None
+                building.append(property)
+                i += 1
+            if i < number_lines:
+                if lines[i]:
+                    return None
+                i += 1
+
+        # optional building note (without empty lines inside) followed by only empty lines
+        start = i
+        while i < number_lines and lines[i]:
+            if lines[i].startswith(('-', '#', ' ')):
+                return None
+            i += 1
+        note = '\n'.join(lines[start:i]).strip()
+        if any(lines[i:]):
+            return None
+        if note:
+            building.append(('Note', note))
+    entry.append(('Building', building))
+
+    return entry
+
+
+def fast_parse_header(content, fields=None):
+    """
+    Reads only the title and the properties at the top of an entry (everything before the note) in the same way as
+    fast_parse_entry, without looking at the rest of the entry and without parsing the values of properties that are
+    not needed. Gives up for anything unusual and returns None.
+
+    :param content: Content of an entry file
+    :param fields: Properties to read (all if None)
+    :return: List of (key, value) tuples starting with the title or None
+    """
+    if not content.startswith('# ') or '\t' in content or '\r' in content:
+        return None
+    end_title = content.find('\n\n')
+    end_properties = content.find('\n\n', end_title + 2)
+    if end_title < 0 or end_properties < 0:
+        return None
+    title = content[2:end_title]
+    if not title or title[0] == ' ' or title[-1] == ' ' or '\n' in title:
+        return None
+    entry = [('Title', title)]
+    for line in content[end_title + 2:end_properties].split('\n'):
+        if not line.startswith('-'):
+            return None
+        if fields is not None and line[1:].lstrip(' ').partition(':')[0].strip() not in fields:
+            continue
+        property = fast_parse_property(line)
+        if not property:
+            return None
+        entry.append(property)
+    return entry
+
+
 def parse(parser, transformer, content):
     tree = parser.parse(content)
     value = transformer.transform(tree)
     return value
 
 
-def create(grammar, Transformer):
-    parser = lark.Lark(grammar, debug=False, parser='lalr')
+def create(grammar, Transformer, cache_file=None):
+    """
+    Sets up a parser for a grammar and returns a parse function.
+
+    :param cache_file: If given, the compiled parser is serialized to this file and loaded from there next time unless
+    the grammar has changed (see the cache option of Lark).
+    """
+    cache = str(cache_file) if cache_file else False
+    parser = lark.Lark(grammar, debug=False, parser='lalr', cache=cache)
     transformer = Transformer()
     return partial(parse, parser, transformer)
 
 
+def get_parser(grammar_file, Transformer):
+    """
+    Returns a parse function for a grammar file, shared by the whole process. The grammar is only compiled if it was
+    changed since the last time, otherwise the serialized parser is loaded from the cache folder.
+    """
+    key = (grammar_file, Transformer)
+    if key not in parsers:
+        grammar = utils.read_text(grammar_file)
+        c.cache_path.mkdir(parents=True, exist_ok=True)
+        cache_file = c.cache_path / f'{grammar_file.stem}.lark-cache'
+        parsers[key] = create(grammar, Transformer, cache_file)
+    return parsers[key]
+
+
 def read_and_parse(content_file: str, grammar_file: str, Transformer: lark.Transformer):
     """
     Reads a content file and a grammar file and parses the content with the grammar following by
@@ -186,8 +601,7 @@ def read_and_parse(content_file: str, grammar_file: str, Transformer: lark.Trans
     :param transformer:
     :return:
     """
-    grammar = utils.read_text(grammar_file)
-    parse = create(grammar, Transformer)
+    parse = get_parser(grammar_file, Transformer)
 
     content = utils.read_text(content_file)
     return parse(content)
\ No newline at end of file
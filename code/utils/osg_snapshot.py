@@ -0,0 +1,271 @@
+"""
+Binary snapshot of the whole database (entries, developers and inspirations) in a single file, which is memory mapped
+and from which entries are only materialized when they are accessed. Opening a valid snapshot needs no parsing and only
+a directory listing of the entries instead of reading every file. It is a local cache (native byte order), rebuilt by
+osg.read_snapshot whenever any source file or the parsing code changes.
+
+Layout:
+    header          magic, stamp (hash of the code version and of names, sizes and modification times of all source
+                    files), number of strings, entries, developers, inspirations and packed integers
+    string offsets  uint32 x (number of strings + 1), offsets into the string data
+    record offsets  uint32 x (number of records + 1), offsets of the records (entries, developers, inspirations) into
+                    the packed integers
+    packed ints     uint32, every record is a sequence of fields: name (string id), kind and then
+                        kind scalar: string id
+                        kind list: number of values, then pairs of string ids (value, comment) per value
+                        kind record: number of fields, followed by these fields (the building section)
+    string data     UTF-8
+Missing values (None) and missing comments are stored as string id NONE. Entry files are stored by name (relative to
+the entries folder), so a copied or moved snapshot never points into another checkout.
+"""
+
+import array
+import hashlib
+import mmap
+import os
+import struct
+from collections.abc import Mapping, Sequence
+
+from utils import osg_cache, osg_parse, constants as c
+
+magic = b'OSGSNAP2'
+header = struct.Struct('=8s16s5I')  # native byte order like the arrays
+NONE = 0xFFFFFFFF
+SCALAR, LIST, RECORD = 0, 1, 2
+
+
+def stamp():
+    """
+    Hash of the code version and of names, sizes and modification times of all source files (no file is read).
+    """
+    h = hashlib.blake2b(osg_cache.version().encode(), digest_size=16)
+    files = sorted((entry.name, entry.stat()) for entry in os.scandir(c.entries_path) if entry.is_file())
+    files.extend((file.name, file.stat()) for file in (c.developer_file, c.inspirations_file))
+    for name, stat in files:
+        h.update(f'{name}:{stat.st_size}:{stat.st_mtime_ns}\n'.encode())
+    return h.digest()
+
+
+class Writer:
+    """
+    Collects strings and packed records.
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.ints = array.array('I')
+        self.record_offsets = array.array('I')
+
+    def string(self, text):
+        if text is None:
+            return NONE
+        string_id = self.strings.get(text)
+        if string_id is None:
+            string_id = self.strings[text] = len(self.strings)
+        return string_id
+
+    def fields(self, record):
+        ints = self.ints
+        for key, value in record.items():
+            ints.append(self.string(key))
+            if isinstance(value, list):
+                ints.extend((LIST, len(value)))
+                for x in value:
+                    ints.extend((self.string(x), self.string(getattr(x, 'comment', None))))
+            elif isinstance(value, (dict, osg_parse.Record)):
+                ints.extend((RECORD, len(value)))
+                self.fields(value)
+            else:
+                ints.extend((SCALAR, self.string(value.name if key == 'File' else value)))
+
+    def record(self, record):
+        self.record_offsets.append(len(self.ints))
+        self.fields(record)
+
+    def write(self, file, stamp, numbers):
+        self.record_offsets.append(len(self.ints))
+        data = [text.encode('utf-8') for text in self.strings]
+        string_offsets = array.array('I', [0])
+        for x in data:
+            string_offsets.append(string_offsets[-1] + len(x))
+        temporary_file = file.with_name(f'.{file.name}.{os.getpid()}.tmp')
+        with open(temporary_file, 'wb') as f:
+            f.write(header.pack(magic, stamp, len(data), *numbers, len(self.ints)))
+            f.write(string_offsets.tobytes())
+            f.write(self.record_offsets.tobytes())
+            f.write(self.ints.tobytes())
+            f.write(b''.join(data))
+        os.replace(temporary_file, file)
+
+
+def write(entries, developers, inspirations, file=c.snapshot_file):
+    """
+    Writes a snapshot.
+
+    :param entries: List of entries
+    :param developers: Mapping name -> developer
+    :param inspirations: Mapping name -> inspiration
+    """
+    writer = Writer()
+    for record in list(entries) + list(developers.values()) + list(inspirations.values()):
+        writer.record(record)
+    c.cache_path.mkdir(parents=True, exist_ok=True)
+    writer.write(file, stamp(), (len(entries), len(developers), len(inspirations)))
+
+
+class Snapshot:
+    """
+    A memory mapped snapshot. Use entries, developers and inspirations.
+    """
+
+    def __init__(self, file):
+        with open(file, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        file_magic, self.stamp, number_strings, number_entries, number_developers, number_inspirations, number_ints = header.unpack_from(self.map)
+        if file_magic != magic:
+            raise RuntimeError(f'{file} is no snapshot')
+        view = memoryview(self.map)
+        position = header.size
+        self.string_offsets = view[position:position + 4 * (number_strings + 1)].cast('I')
+        position += 4 * (number_strings + 1)
+        number_records = number_entries + number_developers + number_inspirations
+        self.record_offsets = view[position:position + 4 * (number_records + 1)].cast('I')
+        position += 4 * (number_records + 1)
+        self.ints = view[position:position + 4 * number_ints].cast('I')
+        position += 4 * number_ints
+        self.data = position
+        self.strings = {}  # decoded strings by id (which also shares equal strings)
+
+        self.entries = Entries(self, 0, number_entries)
+        self.developers = Listing(self, number_entries, number_developers)
+        self.inspirations = Listing(self, number_entries + number_developers, number_inspirations)
+
+    def string(self, string_id):
+        if string_id == NONE:
+            return None
+        text = self.strings.get(string_id)
+        if text is None:
+            start = self.data + self.string_offsets[string_id]
+            end = self.data + self.string_offsets[string_id + 1]
+            text = self.strings[string_id] = self.map[start:end].decode('utf-8')
+        return text
+
+    def field(self, position):
+        """
+        Decodes the field at a position in the packed integers.
+
+        :return: Key, value (list of (key, value) for a record) and the position after the field
+        """
+        ints = self.ints
+        key = self.string(ints[position])
+        kind, n = ints[position + 1], ints[position + 2]
+        position += 3
+        if kind == SCALAR:
+            return key, self.string(n), position
+        if kind == LIST:
+            value = []
+            for i in range(position, position + 2 * n, 2):
+                x = self.string(ints[i])
+                comment = self.string(ints[i + 1])
+                value.append(x if comment is None else osg_parse.Value(x, comment))
+            return key, value, position + 2 * n
+        items = []
+        for _ in range(n):
+            field_key, field_value, position = self.field(position)
+            items.append((field_key, field_value))
+        return key, items, position
+
+    def record(self, index):
+        """
+        List of (key, value) of a record.
+        """
+        position, end = self.record_offsets[index], self.record_offsets[index + 1]
+        items = []
+        while position < end:
+            key, value, position = self.field(position)
+            items.append((key, value))
+        return items
+
+    def name(self, index):
+        """
+        Name (first field) of a listing record without decoding the record.
+        """
+        return self.string(self.ints[self.record_offsets[index] + 2])
+
+
+class Entries(Sequence):
+    """
+    The entries of a snapshot, materialized on first access (and kept).
+    """
+
+    def __init__(self, snapshot, start, number):
+        self.snapshot = snapshot
+        self.start = start
+        self.materialized = [None] * number
+
+    def __len__(self):
+        return len(self.materialized)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        entry = self.materialized[index]
+        if entry is None:
+            if index < 0:
+                index += len(self)
+            items = self.snapshot.record(self.start + index)
+            entry = {}
+            for key, value in items:
+                if key == 'File':
+                    value = c.entries_path / value
+                elif key in c.vocabulary_fields:
+                    value = osg_parse.intern_values(value)
+                entry[key] = value
+            building = dict(entry['Building'])
+            for field in c.vocabulary_building_fields:
+                if field in building:
+                    building[field] = osg_parse.intern_values(building[field])
+            entry['Building'] = osg_parse.Building(building)
+            entry = osg_parse.Entry(entry)
+            entry.mark_unmodified()
+            self.materialized[index] = entry
+        return entry
+
+
+class Listing(Mapping):
+    """
+    Developers or inspirations of a snapshot by name, materialized on first access (and kept).
+    """
+
+    def __init__(self, snapshot, start, number):
+        self.snapshot = snapshot
+        self.start = start
+        self.index = {snapshot.name(start + i): start + i for i in range(number)}
+        self.materialized = {}
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __getitem__(self, name):
+        item = self.materialized.get(name)
+        if item is None:
+            item = self.materialized[name] = dict(self.snapshot.record(self.index[name]))
+        return item
+
+
+def load(file=c.snapshot_file):
+    """
+    Opens the snapshot if it exists and is up to date with the source files.
+
+    :return: Snapshot or None
+    """
+    try:
+        snapshot = Snapshot(file)
+    except (OSError, ValueError, struct.error, RuntimeError):  # missing, empty or damaged
+        return None
+    if snapshot.stamp != stamp():
+        return None
+    return snapshot
@@ -8,7 +8,6 @@ import shutil
 import subprocess
 import tarfile
 import time
-import urllib.request
 import zipfile
 import stat
 
@@ -39,6 +38,31 @@ def write_text(file, text):
         f.write(text)
 
 
+def write_text_if_changed(file, text):
+    """
+    Writes a whole text file (UTF-8 encoded) only if the content differs from what is already stored. Writing is atomic
+    (to a temporary file of this process next to the target, which is then renamed), so the file is never left half
+    written.
+
+    :return: True if the file was written, False if it already had this content
+    """
+    file = pathlib.Path(file)
+    content = text.encode('utf-8')
+    try:
+        if file.read_bytes() == content:
+            return False
+    except FileNotFoundError:
+        pass
+    temporary_file = file.with_name(f'.{file.name}.{os.getpid()}.tmp')
+    try:
+        temporary_file.write_bytes(content)
+        os.replace(temporary_file, file)
+    finally:
+        if temporary_file.exists():
+            temporary_file.unlink()
+    return True
+
+
 def determine_archive_version_generic(name, leading_terms, trailing_terms):
     """
     Given an archive file name, tries to get version information. Generic version that can cut off leading and trailing
@@ -193,6 +217,7 @@ def download_url(url, destination):
 
     Waits one second before, trying to be nice.
     """
+    import urllib.request  # imported here, because it is slow to import and rarely needed
     time.sleep(1)  # we are nice
     with urllib.request.urlopen(url) as response:
         with open(destination, 'wb') as f:
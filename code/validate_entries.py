@@ -0,0 +1,112 @@
+"""
+Validates only the given or the staged entry files, fast enough for a pre-commit hook. Every entry is parsed and
+checked (osg.check_and_process_entry) and additionally checked against the rest of the database with the help of the
+name index (osg_names): titles must be unique (and similar file names are reported) and all developers and
+inspirations must exist in developers.md and inspirations.md.
+
+    python code/validate_entries.py [entry files]
+
+Without files the staged files are validated (osg_changes.staged) with the content staged for the next commit (also of
+the other entries and of the listings), not the content in the working tree. Exits with 1 if there are problems. To use it as a
+git hook, put into .git/hooks/pre-commit:
+
+    #!/bin/sh
+    exec python code/validate_entries.py
+"""
+
+import pathlib
+import sys
+import time
+
+from utils import osg, osg_changes, osg_graph, osg_names, utils, constants as c
+
+# the fields of an entry that must be listed in a listing file, by kind
+listed_fields = {'developer': 'Developer', 'inspiration': 'Inspiration'}
+
+
+def check_entry(file, text, names):
+    """
+    Parses and checks a single entry and its references to the rest of the database.
+
+    :return: List of problems
+    """
+    entry, e = osg.parse_entry(file, text)
+    if e:
+        return [str(e).strip()]
+    problems = []
+
+    # unique title and canonical file name
+    title = entry['Title']
+    others = [name for name in names.files_with_title(title) if name != file.name]
+    if others:
+        problems.append(f'Title "{title}" also used by {", ".join(others)}')
+    canonical = osg.canonical_name(title)
+    candidates = [f'{canonical}.md'] + [f'{canonical}-{i}.md' for i in range(2, 10)]  # see check_and_process_entry
+    similar = [name for name in candidates if name in names.titles and name != file.name and name not in others]
+    if similar:
+        print(f'{file.name}: note - canonical name "{canonical}" also used by {", ".join(similar)}')
+
+    # developers and inspirations must be listed
+    for kind, field in listed_fields.items():
+        for name in entry.get(field, []):
+            if name not in names.names[kind]:
+                problems.append(f'{kind.capitalize()} "{name}" not in {osg_names.listing_files[kind].name}')
+    return problems
+
+
+def check_listing(kind, text):
+    """
+    Checks a changed developers or inspirations file for duplicate names.
+    """
+    return [f'{kind.capitalize()} "{name}" listed twice' for name in osg_graph.duplicates(osg_names.regex_listing_name.findall(text))]
+
+
+def read(file, unstaged):
+    """
+    Content of a file (relative to the root) or None if it does not exist. Files with unstaged changes (see
+    osg_changes.unstaged) are read from the git index, all others have the same content in the working tree.
+    """
+    if unstaged is not None and file in unstaged:
+        return osg_changes.staged_text(file)
+    path = c.root_path / file
+    return utils.read_text(path) if path.is_file() else None
+
+
+if __name__ == "__main__":
+
+    start_time = time.perf_counter()
+
+    if len(sys.argv) > 1:
+        files = [pathlib.Path(x).resolve() for x in sys.argv[1:]]
+        files = [file.relative_to(c.root_path).as_posix() for file in files if file.is_relative_to(c.root_path)]
+        changes = osg_changes.ChangeSet(file for file in files if not file.startswith(osg_changes.code_folder))
+        unstaged = None
+    else:
+        changes = osg_changes.staged()
+        unstaged = osg_changes.unstaged()
+    if changes.complete:
+        print('code changed or staged files unknown, validate all entries')
+        changes = osg_changes.ChangeSet(f'{osg_changes.entries_folder}{file.name}' for file in c.entries_path.glob('*.md'))
+
+    names = osg_names.NameIndex()
+    if unstaged:
+        names.use_staged(unstaged, lambda file: read(file, unstaged))
+    problems = 0
+    number = 0
+    for name in sorted(changes.entries):
+        text = read(f'{osg_changes.entries_folder}{name}', unstaged)
+        if text is None:  # deleted
+            continue
+        number += 1
+        for problem in check_entry(c.entries_path / name, text, names):
+            print(f'{name}: {problem}')
+            problems += 1
+    for kind, file in osg_names.listing_files.items():
+        text = read(file.relative_to(c.root_path).as_posix(), unstaged)
+        if getattr(changes, f'{kind}s') and text is not None:
+            for problem in check_listing(kind, text):
+                print(f'{osg_names.listing_files[kind].name}: {problem}')
+                problems += 1
+
+    print(f'{number} entries validated, {problems} problems ({(time.perf_counter() - start_time) * 1000:.0f}ms)')
+    sys.exit(1 if problems else 0)